@@ -1,6 +1,8 @@
 import PyInstaller.__main__
 import os
+import sys
 import shutil
+import subprocess
 
 # Clean previous builds
 if os.path.exists("app"):
@@ -15,7 +17,8 @@ if os.path.exists("NovaDesk.spec"):
 add_data = [
     "img;img",
     "src/ui/styles.qss;src/ui",
-    "src/engine/model_cache;src/engine/model_cache"
+    "src/engine/model_cache;src/engine/model_cache",
+    "src/engine/intents;src/engine/intents"
 ]
 
 # Formatting --add-data args
@@ -35,7 +38,12 @@ args = [
     "--noconsole",                  # No Terminal
     "--distpath=app",               # Output Dir
     "--clean",                      # Clean Cache
-    "--hidden-import=spacy",        # Hidden Imports
+    "--hidden-import=spacy",        # Hidden Imports (lazy_import() is invisible to PyInstaller)
+    "--hidden-import=numpy",
+    "--hidden-import=onnxruntime",
+    "--hidden-import=tokenizers",
+    "--hidden-import=webbrowser",
+    "--hidden-import=difflib",
     "--hidden-import=en_core_web_sm",
     "--hidden-import=speech_recognition",
     "--hidden-import=pyaudio",
@@ -49,3 +57,8 @@ if os.path.exists("img/NovaDesk.ico"):
 PyInstaller.__main__.run(args)
 
 print("Build Complete! Check the 'app' folder.")
+
+# Optional: fail the build if startup regressed (python build.py --check-startup)
+if "--check-startup" in sys.argv:
+    result = subprocess.run([sys.executable, "scripts/startup_budget.py", "--exe", "app/NovaDesk.exe"])
+    sys.exit(result.returncode)
@@ -7,12 +7,48 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 from PySide6.QtWidgets import QApplication
 from src.ui.main_window import MainWindow
 
+def install_startup_probe(window, report_path):
+    """
+    Used by scripts/startup_budget.py: on the first paint, write the time since
+    launch and the modules loaded so far to `report_path`, then quit.
+    """
+    import json
+    import time
+    from PySide6.QtCore import QObject, QEvent, QTimer
+
+    launched_at = float(os.environ.get("NOVADESK_LAUNCH_TS", time.time()))
+
+    def report():
+        with open(report_path, "w") as f:
+            json.dump({
+                "first_paint_ms": (time.time() - launched_at) * 1000,
+                "modules": sorted({name.split(".")[0] for name in sys.modules}),
+            }, f)
+        QApplication.quit()
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                QTimer.singleShot(0, report)
+            return False
+
+    # Only the UI is measured: keep the AI loader from racing the report
+    window.start_loading = lambda: None
+    window._startup_probe = FirstPaint(window)
+    window.installEventFilter(window._startup_probe)
+
 def main():
     app = QApplication(sys.argv)
     
     # Optional: Font setup here later
     
     window = MainWindow()
+
+    probe_path = os.environ.get("NOVADESK_STARTUP_PROBE")
+    if probe_path:
+        install_startup_probe(window, probe_path)
+
     window.show()
     
     sys.exit(app.exec())
@@ -0,0 +1,78 @@
+"""
+Throughput of concurrent encode() callers, with and without micro-batching.
+
+"direct" gives every client its own session.run (the old behaviour);
+"batched" goes through IntentClassifier.encode, which coalesces requests
+arriving within BATCH_WINDOW_MS into one ONNX call.
+
+Usage (from the repo root):
+    python scripts/benchmark_concurrency.py
+    python scripts/benchmark_concurrency.py --clients 1 4 16 --requests 100
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from src.engine.nlp import IntentClassifier
+
+QUERIES = os.path.join(os.path.dirname(__file__), "eval_queries.json")
+
+
+def run_clients(encode, texts, clients, requests):
+    latencies = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def client(slot):
+        barrier.wait()
+        for i in range(requests):
+            start = time.perf_counter()
+            encode(texts[(slot * requests + i) % len(texts)])
+            latencies[slot].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    flat = np.concatenate([np.array(l) for l in latencies])
+    return clients * requests / elapsed, np.percentile(flat, 50), np.percentile(flat, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=50, help="per client")
+    args = parser.parse_args()
+
+    with open(QUERIES, "r", encoding="utf-8") as f:
+        texts = [sample["query"] for sample in json.load(f)]
+
+    nlp = IntentClassifier()
+    direct = lambda text: nlp.encode_batch([text])[0]
+    direct("warm up")
+    nlp.encode("warm up")
+
+    print(f"\nORT threads: {nlp.ORT_THREADS}, window: {nlp.BATCH_WINDOW_MS}ms, max batch: {nlp.MAX_BATCH}\n")
+    print(f"{'clients':>7}  {'mode':<8} {'qps':>8} {'p50':>9} {'p99':>9}")
+    for clients in args.clients:
+        for mode, encode in (("direct", direct), ("batched", nlp.encode)):
+            batches_before, items_before = nlp.batcher.batches, nlp.batcher.items
+            qps, p50, p99 = run_clients(encode, texts, clients, args.requests)
+            extra = ""
+            if mode == "batched" and nlp.batcher.batches > batches_before:
+                mean = (nlp.batcher.items - items_before) / (nlp.batcher.batches - batches_before)
+                extra = f"  (mean batch {mean:.1f})"
+            print(f"{clients:>7}  {mode:<8} {qps:>8.1f} {p50:>7.2f}ms {p99:>7.2f}ms{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Recall-vs-latency benchmark for the vector index backends.
+
+Uses synthetic L2-normalized 384-d vectors shaped like MiniLM embeddings
+(a shared mean direction, most variance in a low-rank subspace, overlapping
+topics), at several corpus sizes, and reports build time, query latency and
+recall@k against exact search, so a backend can be picked per corpus size.
+Well-separated blobs would make IVF look perfect at every size.
+
+Usage (from the repo root):
+    python scripts/benchmark_vector_index.py
+    python scripts/benchmark_vector_index.py --sizes 1000 10000 --nprobe 4 16 64
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from src.engine.vector_index import FlatIndex, IVFIndex
+
+
+def unit(x):
+    return (x / np.linalg.norm(x, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def make_corpus(size, dim, n_queries, rng, latent=32):
+    """
+    Overlapping topics in a `latent`-d subspace projected to `dim`, plus a
+    common offset and isotropic noise; queries are perturbed corpus points.
+    """
+    projection = rng.normal(size=(latent, dim)) / np.sqrt(latent)
+    mean = unit(rng.normal(size=dim))
+    topics = rng.normal(size=(max(8, size // 50), latent))
+    points = topics[rng.integers(len(topics), size=size)] + rng.normal(size=(size, latent))
+    picks = points[rng.integers(size, size=n_queries)] + 0.7 * rng.normal(size=(n_queries, latent))
+
+    def embed(z):
+        return unit(0.6 * mean + unit(z @ projection) + 0.3 * unit(rng.normal(size=(len(z), dim))))
+
+    return embed(points), embed(picks)
+
+
+def time_queries(index, queries, k):
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        ids, _ = index.search(q, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(ids)
+    return results, np.array(latencies)
+
+
+def recall(results, truth, k):
+    return np.mean([len(set(r[:k]) & set(t[:k])) / k for r, t in zip(results, truth)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 20000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[0, 8, 32],
+                        help="0 = the IVFIndex default (NPROBE_FRACTION of the buckets)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'size':>7}  {'backend':<12} {'build':>9} {'p50':>9} {'p99':>9} {'recall@' + str(args.k):>10}")
+
+    for size in args.sizes:
+        corpus, queries = make_corpus(size, args.dim, args.queries, rng)
+        ids = np.arange(size)
+
+        start = time.perf_counter()
+        flat = FlatIndex(args.dim)
+        flat.add(ids, corpus)
+        build_ms = (time.perf_counter() - start) * 1000
+        truth, lat = time_queries(flat, queries, args.k)
+        print(f"{size:>7}  {'flat':<12} {build_ms:>7.0f}ms {np.percentile(lat, 50):>7.2f}ms "
+              f"{np.percentile(lat, 99):>7.2f}ms {1.0:>10.3f}")
+
+        start = time.perf_counter()
+        ivf = IVFIndex(args.dim, train_size=0)
+        ivf.add(ids, corpus)
+        build_ms = (time.perf_counter() - start) * 1000
+        for nprobe in args.nprobe:
+            ivf.nprobe = nprobe or None
+            results, lat = time_queries(ivf, queries, args.k)
+            label = f"ivf/{len(ivf.centroids)}@{nprobe or 'auto'}"
+            print(f"{size:>7}  {label:<12} {build_ms:>7.0f}ms {np.percentile(lat, 50):>7.2f}ms "
+                  f"{np.percentile(lat, 99):>7.2f}ms {recall(results, truth, args.k):>10.3f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Precedence checks for app discovery (Linux/macOS: uses executable bits and
+.desktop files in temporary folders).
+
+    - PATH: the first directory on PATH wins, like the shell
+    - XDG: a user (XDG_DATA_HOME) .desktop entry overrides a system-wide one
+
+Exits 1 on the first failed check.
+
+Usage (from the repo root):
+    python scripts/check_app_sources.py
+"""
+import os
+import sys
+import stat
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.engine.app_sources import PathSource, DesktopEntrySource
+from src.engine.commander import AppIndexer
+
+
+def write(path, text, executable=False):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if executable:
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+
+def check(name, actual, expected):
+    if actual != expected:
+        print(f"FAIL: {name}: got {actual!r}, expected {expected!r}")
+        sys.exit(1)
+    print(f"OK: {name}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = os.path.join(tmp, "a"), os.path.join(tmp, "b")
+        for folder in (first, second):
+            write(os.path.join(folder, "tool"), "#!/bin/sh\n", executable=True)
+        indexer = AppIndexer(sources=[PathSource([first, second])])
+        check("first PATH entry wins", indexer.app_map.get("tool"), os.path.join(first, "tool"))
+
+        user, system = os.path.join(tmp, "home", "applications"), os.path.join(tmp, "usr", "applications")
+        for folder in (user, system):
+            write(os.path.join(folder, "foo.desktop"), "[Desktop Entry]\nType=Application\nName=Foo\nExec=foo\n")
+        indexer = AppIndexer(sources=[DesktopEntrySource([user, system])])
+        check("user .desktop overrides system", indexer.app_map.get("foo"), os.path.join(user, "foo.desktop"))
+
+
+if __name__ == "__main__":
+    main()
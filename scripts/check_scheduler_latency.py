@@ -0,0 +1,139 @@
+"""
+Interactive latency under a background crawl, with and without the scheduler.
+
+Simulates typing in bursts: --burst keystrokes --interval ms apart, then a
+--gap ms pause (longer than the scheduler's typing grace, so the crawl
+resumes). Every keystroke submits a small CPU-bound query at INTERACTIVE
+priority and records its submit-to-result latency. It runs three times:
+
+    idle           nothing else running (baseline)
+    scheduled      a crawl (os.walk + CPU per directory) runs as BACKGROUND
+                   jobs that call checkpoint() per directory
+    uncoordinated  the same crawl on plain threads (what we had before)
+
+Exits 1 when the scheduled p99 exceeds max(2 x baseline, baseline + 5ms),
+or when the scheduled crawl got through less than MIN_PROGRESS of the
+directories the uncoordinated one did (a paused crawl trivially passes).
+
+--no-typing skips user_active(): the crawl then only yields at checkpoints.
+
+Usage (from the repo root):
+    python scripts/check_scheduler_latency.py
+    python scripts/check_scheduler_latency.py --queries 300 --crawlers 4 --root /usr
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.engine.scheduler import WorkScheduler, INTERACTIVE, BACKGROUND
+
+MIN_PROGRESS = 0.25
+
+
+def burn(ms):
+    """ Pure-Python CPU work (holds the GIL, like tokenizing or ranking). """
+    end = time.perf_counter() + ms / 1000
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(200))
+    return total
+
+
+def crawl(root, stop, checkpoint, progress):
+    """ Walks `root` over and over, doing some CPU work per directory. """
+    while not stop.is_set():
+        for folder, dirs, files in os.walk(root):
+            if stop.is_set():
+                break
+            checkpoint()
+            sorted(f.lower() for f in files)
+            burn(1)
+            progress.append(1)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(mode, args):
+    scheduler = WorkScheduler(max_workers=args.threads)
+    stop = threading.Event()
+    progress = []   # one item per directory crawled (list.append is atomic)
+    crawlers = []
+    if mode == "scheduled":
+        crawlers = [scheduler.submit(crawl, args.root, stop, scheduler.checkpoint, progress, priority=BACKGROUND)
+                    for _ in range(args.crawlers)]
+    elif mode == "uncoordinated":
+        crawlers = [threading.Thread(target=crawl, args=(args.root, stop, lambda: None, progress), daemon=True)
+                    for _ in range(args.crawlers)]
+        for t in crawlers:
+            t.start()
+    time.sleep(0.2)  # let the crawl get going
+
+    latencies = []
+    for i in range(args.queries):
+        if not args.no_typing:
+            scheduler.user_active()
+        start = time.perf_counter()
+        scheduler.submit(burn, args.work, priority=INTERACTIVE).result()
+        latencies.append((time.perf_counter() - start) * 1000)
+        pause = args.gap if (i + 1) % args.burst == 0 else args.interval
+        time.sleep(pause / 1000)
+
+    stop.set()
+    for crawler in crawlers:
+        crawler.result() if mode == "scheduled" else crawler.join()
+    return latencies, scheduler.metrics(), len(progress)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=120)
+    parser.add_argument("--work", type=float, default=2.0, help="CPU ms per interactive query")
+    parser.add_argument("--burst", type=int, default=6, help="keystrokes per typing burst")
+    parser.add_argument("--interval", type=float, default=30.0, help="ms between keystrokes in a burst")
+    parser.add_argument("--gap", type=float, default=800.0, help="ms pause between bursts")
+    parser.add_argument("--crawlers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="scheduler thread budget")
+    parser.add_argument("--root", default=sys.prefix, help="folder to crawl")
+    parser.add_argument("--no-typing", action="store_true",
+                        help="skip user_active(): background yields only at checkpoints")
+    args = parser.parse_args()
+
+    print(f"{'mode':<14} {'p50':>9} {'p99':>9} {'max':>9} {'crawled':>9}")
+    results, crawled = {}, {}
+    for mode in ("idle", "scheduled", "uncoordinated"):
+        latencies, metrics, crawled[mode] = run(mode, args)
+        results[mode] = percentile(latencies, 0.99)
+        print(f"{mode:<14} {percentile(latencies, 0.5):>7.2f}ms {results[mode]:>7.2f}ms {max(latencies):>7.2f}ms "
+              f"{crawled[mode]:>9}")
+        if mode == "scheduled":
+            scheduled_metrics = metrics
+
+    print("\nScheduler metrics (scheduled run):")
+    for name, m in scheduled_metrics.items():
+        print(f"  {name:<12} completed {m['completed']:>5}  queued {m['queued']:>3}  "
+              f"wait p50 {m['wait_p50_ms']:.2f}ms  p99 {m['wait_p99_ms']:.2f}ms")
+
+    failed = False
+    budget = max(results["idle"] * 2, results["idle"] + 5.0)
+    if results["scheduled"] > budget:
+        print(f"\nFAIL: interactive p99 {results['scheduled']:.2f}ms under background load (budget {budget:.2f}ms)")
+        failed = True
+    progress = crawled["scheduled"] / max(1, crawled["uncoordinated"])
+    if progress < MIN_PROGRESS:
+        print(f"FAIL: scheduled crawl made {progress:.0%} of uncoordinated progress (minimum {MIN_PROGRESS:.0%})")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"\nOK: interactive p99 {results['scheduled']:.2f}ms under background load (budget {budget:.2f}ms), "
+          f"crawl at {progress:.0%} of uncoordinated progress")
+
+
+if __name__ == "__main__":
+    main()
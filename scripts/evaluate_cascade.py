@@ -0,0 +1,66 @@
+"""
+Compares the two-stage cascade (lexical -> MiniLM) against MiniLM-only
+on a labeled query set, reporting accuracy and per-query latency.
+
+Usage (from the repo root):
+    python scripts/evaluate_cascade.py [queries.json] [--margin 0.15]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from src.engine.nlp import IntentClassifier
+
+DEFAULT_QUERIES = os.path.join(os.path.dirname(__file__), "eval_queries.json")
+
+
+def run(nlp, samples, cascade):
+    latencies, correct, stages = [], 0, {}
+    for sample in samples:
+        start = time.perf_counter()
+        intent, _, stage = nlp.classify_intent(sample["query"], cascade=cascade)
+        latencies.append((time.perf_counter() - start) * 1000)
+        correct += intent == sample["intent"]
+        stages[stage] = stages.get(stage, 0) + 1
+    return np.array(latencies), correct / len(samples), stages
+
+
+def report(name, latencies, accuracy, stages):
+    print(f"{name:<14} acc={accuracy:6.1%}  "
+          f"mean={latencies.mean():7.2f}ms  p50={np.percentile(latencies, 50):7.2f}ms  "
+          f"p99={np.percentile(latencies, 99):7.2f}ms  stages={stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("queries", nargs="?", default=DEFAULT_QUERIES)
+    parser.add_argument("--margin", type=float, default=IntentClassifier.CASCADE_MARGIN)
+    parser.add_argument("--min-score", type=float, default=IntentClassifier.CASCADE_MIN_SCORE)
+    args = parser.parse_args()
+
+    with open(args.queries, "r", encoding="utf-8") as f:
+        samples = json.load(f)
+
+    nlp = IntentClassifier()
+    nlp.CASCADE_MARGIN = args.margin
+    nlp.CASCADE_MIN_SCORE = args.min_score
+
+    # Warm-up so the first ONNX run does not skew the numbers
+    nlp.encode("warm up")
+
+    print(f"\n{len(samples)} labeled queries, margin={args.margin}, min_score={args.min_score}\n")
+    neural = run(nlp, samples, cascade=False)
+    cascade = run(nlp, samples, cascade=True)
+    report("neural-only", *neural)
+    report("cascade", *cascade)
+    print(f"\nSpeed-up (mean): {neural[0].mean() / cascade[0].mean():.1f}x, "
+          f"accuracy delta: {cascade[1] - neural[1]:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Appends mean-pooling + L2-normalization to the MiniLM graph so the session
+returns `sentence_embedding` (batch x 384) instead of `last_hidden_state`
+(batch x seq x 384). Writes onnx/model_pooled.onnx, which IntentClassifier
+picks up automatically, then checks it against the NumPy pooling.
+
+IntentClassifier prefers onnx/model_mmap.onnx when present, so an existing
+mmap variant is rebuilt from the fused graph (otherwise the stale unfused
+copy would keep loading).
+
+Usage (from the repo root, needs the `onnx` package at build time):
+    python scripts/fuse_pooling.py
+    python scripts/fuse_pooling.py --verify-only
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper
+
+MODEL_DIR = os.path.join("src", "engine", "model_cache")
+SRC_PATH = os.path.join(MODEL_DIR, "onnx", "model.onnx")
+DST_PATH = os.path.join(MODEL_DIR, "onnx", "model_pooled.onnx")
+MMAP_PATH = os.path.join(MODEL_DIR, "onnx", "model_mmap.onnx")
+POOLED_OUTPUT = "sentence_embedding"
+
+SAMPLES = [
+    "open browser",
+    "play some music please",
+    "where is the invoice pdf I downloaded last week",
+    "mute",
+]
+
+
+def fuse_pooling(src_path=SRC_PATH, dst_path=DST_PATH):
+    model = onnx.load(src_path)
+    graph = model.graph
+    opset = next(o.version for o in model.opset_import if o.domain in ("", "ai.onnx"))
+
+    hidden = graph.output[0].name
+    hidden_size = graph.output[0].type.tensor_type.shape.dim[-1].dim_value or 384
+
+    nodes, inits = [], []
+
+    def axes_args(name, axes):
+        # Since opset 13, Unsqueeze/ReduceSum take axes as an input, not an attribute
+        if opset >= 13:
+            inits.append(helper.make_tensor(name, TensorProto.INT64, [len(axes)], axes))
+            return [name], {}
+        return [], {"axes": axes}
+
+    extra, attrs = axes_args("pool_unsqueeze_axes", [-1])
+    nodes.append(helper.make_node("Cast", ["attention_mask"], ["pool_mask_f"], to=TensorProto.FLOAT))
+    nodes.append(helper.make_node("Unsqueeze", ["pool_mask_f"] + extra, ["pool_mask"], **attrs))
+    nodes.append(helper.make_node("Mul", [hidden, "pool_mask"], ["pool_masked"]))
+
+    extra, attrs = axes_args("pool_sum_axes", [1])
+    nodes.append(helper.make_node("ReduceSum", ["pool_masked"] + extra, ["pool_sum"], keepdims=0, **attrs))
+    nodes.append(helper.make_node("ReduceSum", ["pool_mask"] + extra, ["pool_count"], keepdims=0, **attrs))
+
+    inits.append(helper.make_tensor("pool_eps", TensorProto.FLOAT, [], [1e-9]))
+    nodes.append(helper.make_node("Max", ["pool_count", "pool_eps"], ["pool_count_clipped"]))
+    nodes.append(helper.make_node("Div", ["pool_sum", "pool_count_clipped"], ["pool_mean"]))
+    nodes.append(helper.make_node("LpNormalization", ["pool_mean"], [POOLED_OUTPUT], axis=-1, p=2))
+
+    graph.node.extend(nodes)
+    graph.initializer.extend(inits)
+    del graph.output[:]
+    graph.output.append(helper.make_tensor_value_info(POOLED_OUTPUT, TensorProto.FLOAT, ["batch", hidden_size]))
+
+    onnx.checker.check_model(model)
+    onnx.save(model, dst_path)
+    print(f"Wrote {dst_path} (opset {opset}, output '{POOLED_OUTPUT}').")
+
+
+def numpy_pooling(last_hidden_state, attention_mask):
+    """ The pre-fusion IntentClassifier.encode post-processing, kept as the reference. """
+    mask_expanded = np.expand_dims(attention_mask, -1)
+    sum_embeddings = np.sum(last_hidden_state * mask_expanded, axis=1)
+    sum_mask = np.clip(np.sum(mask_expanded, axis=1), a_min=1e-9, a_max=None)
+    mean_pooled = sum_embeddings / sum_mask
+    return mean_pooled / np.linalg.norm(mean_pooled, axis=1, keepdims=True)
+
+
+def verify(src_path=SRC_PATH, dst_path=DST_PATH, tolerance=1e-5):
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+
+    tokenizer = Tokenizer.from_file(os.path.join(MODEL_DIR, "tokenizer.json"))
+    tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+    encoded = tokenizer.encode_batch(SAMPLES)
+    inputs = {
+        "input_ids": np.array([e.ids for e in encoded], dtype=np.int64),
+        "attention_mask": np.array([e.attention_mask for e in encoded], dtype=np.int64),
+        "token_type_ids": np.array([e.type_ids for e in encoded], dtype=np.int64),
+    }
+
+    original = ort.InferenceSession(src_path)
+    fused = ort.InferenceSession(dst_path)
+    hidden = original.run(None, inputs)[0]
+    expected = numpy_pooling(hidden, inputs["attention_mask"])
+    actual = fused.run([POOLED_OUTPUT], inputs)[0]
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    print(f"Output per batch: {hidden.nbytes} bytes (last_hidden_state) -> {actual.nbytes} bytes ({POOLED_OUTPUT})")
+    print(f"Max abs difference vs NumPy pooling: {max_diff:.2e} (tolerance {tolerance:.0e})")
+    return max_diff <= tolerance
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verify-only", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        fuse_pooling()
+    if not verify():
+        print("FAILED: fused graph does not match NumPy pooling.")
+        sys.exit(1)
+    print("OK: fused graph matches NumPy pooling.")
+
+    if not args.verify_only and os.path.exists(MMAP_PATH):
+        from prepare_mmap_model import prepare_mmap_model   # scripts/ is on sys.path
+        prepare_mmap_model()
+
+
+if __name__ == "__main__":
+    main()
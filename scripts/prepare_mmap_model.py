@@ -0,0 +1,39 @@
+"""
+Re-saves the ONNX model with its weights as external data
+(onnx/model_mmap.onnx + onnx/model_mmap.onnx.data).
+
+ONNX Runtime memory-maps external initializers instead of copying them
+onto the heap, so in low-memory mode (NOVADESK_IDLE_UNLOAD) the weights
+come back from the OS page cache when the session is reloaded.
+
+Requires the `onnx` package (build-time only).
+"""
+import os
+import onnx
+
+MODEL_DIR = os.path.join("src", "engine", "model_cache", "onnx")
+
+
+def prepare_mmap_model():
+    # Prefer the fused-pooling graph (scripts/fuse_pooling.py) when it exists
+    src_path = os.path.join(MODEL_DIR, "model_pooled.onnx")
+    if not os.path.exists(src_path):
+        src_path = os.path.join(MODEL_DIR, "model.onnx")
+    dst_path = os.path.join(MODEL_DIR, "model_mmap.onnx")
+    data_name = "model_mmap.onnx.data"
+
+    print(f"Converting {src_path} -> {dst_path} (+ {data_name})...")
+    model = onnx.load(src_path)
+    onnx.save_model(
+        model,
+        dst_path,
+        save_as_external_data=True,
+        all_tensors_to_one_file=True,
+        location=data_name,
+        size_threshold=1024,
+    )
+    print("Done.")
+
+
+if __name__ == "__main__":
+    prepare_mmap_model()
@@ -0,0 +1,171 @@
+"""
+Headless load test: replays a recorded query trace (NOVADESK_TRACE=1)
+through IntentClassifier.predict and Commander.fetch_candidates.
+
+Every recorded keystroke is replayed as a search-as-you-type query, then the
+submitted query. Reports p50/p99 latency per stage, the cascade stage mix
+(how often MiniLM was skipped), cache hit rates (exact-trigger map, and the
+AppIndexer.resolve() cache for the by-name opens submitted queries fall back
+to) and candidate hit rates, so the same trace can be compared across
+configurations.
+
+Usage (from the repo root):
+    python scripts/replay_trace.py ~/.novadesk/traces/trace-20261019.jsonl
+    python scripts/replay_trace.py trace.jsonl --speed 10       # 10x faster than recorded
+    python scripts/replay_trace.py trace.jsonl --speed 0        # no think time
+    python scripts/replay_trace.py trace.jsonl --no-typing --margin 0.3
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from src.engine.nlp import IntentClassifier
+from src.engine.commander import Commander
+from src.engine.trace import load_trace
+from src.engine.knowledge_base import INTENT_DB
+
+STAGES = ("correct", "classify", "entity", "candidates", "total")
+
+
+class Stats:
+    def __init__(self):
+        self.latency = {stage: [] for stage in STAGES}
+        self.cascade = {}
+        self.queries = 0
+        self.with_candidates = 0
+        self.chosen_found = 0
+        self.chosen_total = 0
+        self.resolve_hits = 0
+        self.resolve_misses = 0
+
+    def record(self, timings):
+        for stage in STAGES:
+            self.latency[stage].append(timings[stage])
+        self.cascade[timings["stage"]] = self.cascade.get(timings["stage"], 0) + 1
+        self.queries += 1
+
+    def report(self, title, wall_seconds):
+        print(f"\n== {title}: {self.queries} queries in {wall_seconds:.1f}s ==")
+        if not self.queries:
+            return
+        print(f"{'stage':<12} {'p50':>9} {'p99':>9} {'mean':>9}")
+        for stage in STAGES:
+            values = np.array(self.latency[stage])
+            print(f"{stage:<12} {np.percentile(values, 50):>7.2f}ms {np.percentile(values, 99):>7.2f}ms "
+                  f"{values.mean():>7.2f}ms")
+
+        skipped = self.cascade.get("exact", 0) + self.cascade.get("lexical", 0)
+        mix = ", ".join(f"{stage} {count / self.queries:.0%}" for stage, count in sorted(self.cascade.items()))
+        print(f"cascade: {mix} -> MiniLM skipped {skipped / self.queries:.0%}")
+        exact = self.cascade.get("exact", 0)
+        print(f"exact-trigger map: {exact} hits, {self.queries - exact} misses ({exact / self.queries:.0%})")
+        lookups = self.resolve_hits + self.resolve_misses
+        if lookups:
+            print(f"resolve cache: {self.resolve_hits} hits, {self.resolve_misses} misses "
+                  f"({self.resolve_hits / lookups:.0%})")
+        print(f"queries with candidates: {self.with_candidates / self.queries:.0%}")
+        if self.chosen_total:
+            print(f"chosen candidate in results: {self.chosen_found}/{self.chosen_total}")
+
+
+def run_query(nlp, commander, text, stats):
+    timings = {}
+    start = time.perf_counter()
+    intent, score, entity = nlp.predict(text, timings=timings)
+    t = time.perf_counter()
+    # Same call as MainWindow: providers see the raw query and the classifier's confidence
+    candidates = commander.fetch_candidates(intent, entity, query=text, score=score)
+    timings["candidates"] = (time.perf_counter() - t) * 1000
+    timings["total"] = (time.perf_counter() - start) * 1000
+    stats.record(timings)
+    if candidates:
+        stats.with_candidates += 1
+    return intent, score, entity, candidates
+
+
+def resolve_query(commander, intent, score, entity, candidates, stats):
+    """
+    The lookup MainWindow makes on submit when no provider answered: a confident
+    generic_search intent goes to handle_generic_open(entity) -> indexer.resolve().
+    Replayed without launching anything.
+    """
+    if candidates or score <= 0.35 or INTENT_DB.get(intent, {}).get("action") != "generic_search":
+        return
+    indexer = commander.indexer
+    hits, misses = indexer.resolve_hits, indexer.resolve_misses
+    indexer.resolve(entity)
+    stats.resolve_hits += indexer.resolve_hits - hits
+    stats.resolve_misses += indexer.resolve_misses - misses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = recorded pace, 0 = no waits")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="cap idle time between sessions (s)")
+    parser.add_argument("--no-typing", action="store_true", help="replay submitted queries only")
+    parser.add_argument("--margin", type=float, default=IntentClassifier.CASCADE_MARGIN)
+    parser.add_argument("--min-score", type=float, default=IntentClassifier.CASCADE_MIN_SCORE)
+    args = parser.parse_args()
+
+    sessions = load_trace(args.trace)
+    nlp = IntentClassifier()
+    nlp.CASCADE_MARGIN = args.margin
+    nlp.CASCADE_MIN_SCORE = args.min_score
+    commander = Commander()
+
+    typing, submitted = Stats(), Stats()
+    quiet = io.StringIO()
+    wall_start = time.perf_counter()
+
+    def wait_until(trace_seconds):
+        # Paced against one wall clock: processing time is absorbed, not added
+        if args.speed:
+            time.sleep(max(0.0, wall_start + trace_seconds / args.speed - time.perf_counter()))
+
+    clock = 0.0         # replay position in trace seconds (idle gaps capped at --max-gap)
+    previous_end = None # epoch of the previous session's last keystroke
+    for session in sessions:
+        if previous_end is not None:
+            clock += min(max(0.0, session["t"] - previous_end), args.max_gap)
+        # Absolute keystroke times from the per-key deltas; the query is submitted at the last one
+        key_times = []
+        for delay_ms, text in session["k"]:
+            clock += delay_ms / 1000
+            key_times.append(clock)
+        previous_end = session["t"] + (key_times[-1] - key_times[0] if key_times else 0.0)
+
+        with contextlib.redirect_stdout(quiet):
+            if not args.no_typing:
+                for at, (delay_ms, text) in zip(key_times, session["k"]):
+                    wait_until(at)
+                    if text.strip():
+                        run_query(nlp, commander, text, typing)
+            wait_until(clock)
+
+            intent, score, entity, candidates = run_query(nlp, commander, session["q"], submitted)
+            resolve_query(commander, intent, score, entity, candidates, submitted)
+        quiet.seek(0)
+        quiet.truncate()
+
+        if session.get("c"):
+            submitted.chosen_total += 1
+            names = {c["name"].lower() for c in candidates}
+            submitted.chosen_found += session["c"].lower() in names
+
+    wall = time.perf_counter() - wall_start
+    print(f"\nReplayed {len(sessions)} sessions from {args.trace} (speed {args.speed or 'max'}, "
+          f"margin {args.margin}, min_score {args.min_score})")
+    if not args.no_typing:
+        typing.report("search-as-you-type", wall)
+    submitted.report("submitted queries", wall)
+
+
+if __name__ == "__main__":
+    main()
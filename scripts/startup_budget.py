@@ -0,0 +1,113 @@
+"""
+Startup-time regression check.
+
+Launches NovaDesk with a first-paint probe (see run.py), collects
+`-X importtime` data and wall-clock time to first paint, and fails
+(exit code 1) when a budget in startup_budget.json is exceeded or a
+deferred heavy module was imported before the window painted.
+
+Usage (from the repo root):
+    python scripts/startup_budget.py                      # dev mode (run.py)
+    python scripts/startup_budget.py --exe app/NovaDesk.exe   # frozen build
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_BUDGET = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+
+
+def parse_importtime(stderr):
+    """ Returns {top_level_module: cumulative_us} from `-X importtime` output. """
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is encoded as two extra spaces per level
+        if len(name) - len(name.lstrip()) == 1:
+            top_level[name.strip()] = int(cumulative)
+    return top_level
+
+
+def launch(cmd, offscreen, timeout):
+    """ Runs one probed launch; returns (probe_report, stderr). """
+    fd, report_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    os.remove(report_path)
+
+    env = dict(os.environ)
+    env["NOVADESK_STARTUP_PROBE"] = report_path
+    env["NOVADESK_LAUNCH_TS"] = repr(time.time())
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout)
+    if not os.path.exists(report_path):
+        raise RuntimeError(f"No startup report (exit code {proc.returncode}):\n{proc.stderr[-2000:]}")
+    with open(report_path) as f:
+        report = json.load(f)
+    os.remove(report_path)
+    return report, proc.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exe", help="Frozen executable built by build.py")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--offscreen", action="store_true", help="Use Qt's offscreen platform (CI)")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+
+    if args.exe:
+        cmd = [os.path.abspath(args.exe)]
+        paint_budget = budget["exe_first_paint_ms"]
+    else:
+        cmd = [sys.executable, "-X", "importtime", "run.py"]
+        paint_budget = budget["first_paint_ms"]
+
+    paints, import_totals, imports, modules = [], [], {}, set()
+    for _ in range(args.runs):
+        report, stderr = launch(cmd, args.offscreen, args.timeout)
+        paints.append(report["first_paint_ms"])
+        modules.update(report["modules"])
+        if not args.exe:
+            imports = parse_importtime(stderr)
+            import_totals.append(sum(imports.values()) / 1000)
+
+    failures = []
+    first_paint = statistics.median(paints)
+    print(f"First paint: {first_paint:.0f}ms (median of {args.runs}, budget {paint_budget}ms)")
+    if first_paint > paint_budget:
+        failures.append(f"first paint {first_paint:.0f}ms > {paint_budget}ms")
+
+    if import_totals:
+        import_ms = statistics.median(import_totals)
+        print(f"Top-level imports: {import_ms:.0f}ms (budget {budget['import_ms']}ms)")
+        for name, us in sorted(imports.items(), key=lambda kv: -kv[1])[:10]:
+            print(f"  {us / 1000:8.1f}ms  {name}")
+        if import_ms > budget["import_ms"]:
+            failures.append(f"imports {import_ms:.0f}ms > {budget['import_ms']}ms")
+
+    eager = sorted(modules & set(budget["deferred_modules"]))
+    if eager:
+        failures.append(f"imported before first paint: {', '.join(eager)}")
+
+    if failures:
+        print("\nSTARTUP BUDGET EXCEEDED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nStartup budget OK.")
+
+
+if __name__ == "__main__":
+    main()
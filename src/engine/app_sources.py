@@ -0,0 +1,204 @@
+import os
+import sys
+import shlex
+import subprocess
+import configparser
+from src.engine.paths import USER_APP_DIR
+from src.engine.scheduler import get_scheduler
+
+
+class AppEntry:
+    def __init__(self, name, path, source, priority):
+        self.name = name            # lowercase lookup key
+        self.path = path            # what gets launched (.lnk, .desktop, exe, ...)
+        self.source = source
+        self.priority = priority    # lower wins when two sources know the same name
+
+    def __repr__(self):
+        return f"AppEntry({self.name!r}, {self.path!r}, source={self.source!r})"
+
+
+class AppSource:
+    """
+    One place apps can be discovered. Subclasses implement scan() and
+    return AppEntry objects; AppIndexer runs all sources in parallel.
+    """
+    NAME = "base"
+    PRIORITY = 50
+
+    def available(self):
+        return True
+
+    def scan(self):
+        raise NotImplementedError
+
+    def entry(self, name, path):
+        return AppEntry(name.lower(), path, self.NAME, self.PRIORITY)
+
+
+class FolderSource(AppSource):
+    """ Files with the given extensions under a set of folders (recursive). """
+    NAME = "folder"
+    PRIORITY = 0
+    EXTENSIONS = (".lnk", ".exe", ".url", ".desktop", ".sh", ".appimage")
+
+    def __init__(self, folders, extensions=None):
+        self.folders = [f for f in folders if f]
+        if extensions is not None:
+            self.EXTENSIONS = tuple(e.lower() for e in extensions)
+
+    def available(self):
+        return any(os.path.isdir(f) for f in self.folders)
+
+    def scan(self):
+        entries = []
+        scheduler = get_scheduler()
+        for root_path in self.folders:
+            if not os.path.isdir(root_path): continue
+            for root, dirs, files in os.walk(root_path):
+                scheduler.checkpoint() # Pause background crawls while the user types
+                for file in files:
+                    stem, ext = os.path.splitext(file)
+                    if ext.lower() in self.EXTENSIONS:
+                        entries.append(self.entry(stem, os.path.join(root, file)))
+        return entries
+
+
+class StartMenuSource(FolderSource):
+    """ Windows Start Menu shortcuts (all users + current user). """
+    NAME = "start_menu"
+    PRIORITY = 10
+
+    def __init__(self, folders=None):
+        if folders is None:
+            folders = [
+                os.path.join(os.environ.get('ProgramData', ''), r'Microsoft\Windows\Start Menu\Programs'),
+                os.path.join(os.environ.get('APPDATA', ''), r'Microsoft\Windows\Start Menu\Programs')
+            ]
+        super().__init__(folders, extensions=(".lnk",))
+
+
+class DesktopEntrySource(AppSource):
+    """ freedesktop.org .desktop files from the XDG application folders. """
+    NAME = "xdg"
+    PRIORITY = 10
+
+    def __init__(self, folders=None):
+        if folders is None:
+            data_home = os.environ.get("XDG_DATA_HOME", os.path.join(os.path.expanduser("~"), ".local", "share"))
+            data_dirs = os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")
+            folders = [os.path.join(d, "applications") for d in [data_home] + data_dirs if d]
+        self.folders = folders
+
+    def available(self):
+        return any(os.path.isdir(f) for f in self.folders)
+
+    @staticmethod
+    def read_entry(path):
+        """ Returns the [Desktop Entry] section as a dict (empty if unreadable). """
+        parser = configparser.RawConfigParser(interpolation=None, strict=False)
+        parser.optionxform = str
+        try:
+            parser.read(path, encoding="utf-8")
+            return dict(parser["Desktop Entry"])
+        except Exception:
+            return {}
+
+    @staticmethod
+    def exec_command(path):
+        """ The Exec line of a .desktop file as argv, with %f/%u/... field codes dropped. """
+        exec_line = DesktopEntrySource.read_entry(path).get("Exec", "")
+        return [arg for arg in shlex.split(exec_line) if not (len(arg) == 2 and arg[0] == "%")]
+
+    def scan(self):
+        entries = []
+        scheduler = get_scheduler()
+        # Earlier folders win (XDG_DATA_HOME overrides system-wide entries):
+        # AppIndexer.merge keeps the first entry seen at equal priority
+        for folder in self.folders:
+            if not os.path.isdir(folder): continue
+            for root, dirs, files in os.walk(folder):
+                scheduler.checkpoint()
+                for file in files:
+                    if not file.endswith(".desktop"): continue
+                    path = os.path.join(root, file)
+                    data = self.read_entry(path)
+                    if data.get("Type", "Application") != "Application": continue
+                    if data.get("NoDisplay") == "true" or data.get("Hidden") == "true": continue
+                    if "Exec" not in data: continue
+                    entries.append(self.entry(data.get("Name", file[:-len(".desktop")]), path))
+        return entries
+
+
+class PathSource(AppSource):
+    """ Executables on PATH (PATHEXT-aware on Windows). """
+    NAME = "path"
+    PRIORITY = 30
+
+    def __init__(self, path_dirs=None):
+        if path_dirs is None:
+            path_dirs = os.environ.get("PATH", "").split(os.pathsep)
+        self.path_dirs = [d for d in path_dirs if d]
+
+    def scan(self):
+        entries = []
+        if sys.platform == "win32":
+            exts = [e.lower() for e in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(";") if e]
+        scheduler = get_scheduler()
+        # First PATH entry wins, like the shell (merge keeps the first one seen)
+        for folder in self.path_dirs:
+            scheduler.checkpoint()
+            try:
+                files = os.scandir(folder)
+            except OSError:
+                continue
+            with files:
+                for f in files:
+                    try:
+                        if not f.is_file(): continue
+                        if sys.platform == "win32":
+                            stem, ext = os.path.splitext(f.name)
+                            if ext.lower() not in exts: continue
+                        else:
+                            stem = f.name
+                            if not os.access(f.path, os.X_OK): continue
+                    except OSError:
+                        continue
+                    entries.append(self.entry(stem, f.path))
+        return entries
+
+
+class BuiltinSource(AppSource):
+    """ Common Windows apps that might not have shortcuts. """
+    NAME = "builtin"
+    PRIORITY = 20
+    APPS = {
+        "notepad": "notepad.exe",
+        "calculator": "calc.exe",
+        "cmd": "cmd.exe",
+        "powershell": "powershell.exe",
+        "explorer": "explorer.exe",
+    }
+
+    def available(self):
+        return sys.platform == "win32"
+
+    def scan(self):
+        return [self.entry(name, exe) for name, exe in self.APPS.items()]
+
+
+def default_sources():
+    """ Every source that applies to this machine, plus user folders. """
+    user_dirs = [USER_APP_DIR] + os.environ.get("NOVADESK_APP_DIRS", "").split(os.pathsep)
+    sources = [FolderSource(user_dirs), StartMenuSource(), DesktopEntrySource(), BuiltinSource(), PathSource()]
+    return [s for s in sources if s.available()]
+
+
+def launch(path):
+    """ Opens an indexed app: shell association on Windows, Exec line / direct spawn elsewhere. """
+    if sys.platform == "win32":
+        os.startfile(path)
+    elif path.endswith(".desktop"):
+        subprocess.Popen(DesktopEntrySource.exec_command(path), start_new_session=True)
+    else:
+        subprocess.Popen([path], start_new_session=True)
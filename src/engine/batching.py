@@ -0,0 +1,82 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class BatchingEncoder:
+    """
+    Thread-safe front end for a batch encoder function.
+
+    Callers get a Future per text (usable from asyncio via asyncio.wrap_future).
+    A single worker drains the queue into one encode_batch() call (up to
+    `max_batch`). A lone request runs immediately; only when others are
+    already queued does the worker wait up to `window_ms` for stragglers.
+    The queue is bounded: when `max_pending` requests are waiting, submit() blocks (or raises queue.Full after `timeout`) instead of piling up.
+    """
+    def __init__(self, encode_batch, max_batch=32, window_ms=2.0, max_pending=256):
+        self.encode_batch = encode_batch
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, text, timeout=None):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future), timeout=timeout)
+        return future
+
+    def encode(self, text, timeout=None):
+        return self.submit(text, timeout=timeout).result()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    @property
+    def mean_batch_size(self):
+        return self.items / self.batches if self.batches else 0.0
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+                    self._worker.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                # Concurrent callers are queued: wait out the window for more.
+                # Otherwise only take what is already there.
+                if len(batch) > 1 and remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                embeddings = self.encode_batch([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
@@ -0,0 +1,141 @@
+import re
+import ast
+import math
+import operator
+
+# Arithmetic is evaluated from the AST with a whitelist: never eval()
+BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+MAX_ROUND_DIGITS = 15
+
+
+def _round(value, ndigits=0):
+    # round(7, -10**8) builds 10**(10**8) in C, holding the GIL: bound ndigits
+    if abs(ndigits) > MAX_ROUND_DIGITS:
+        raise ValueError("too many digits")
+    return round(value, ndigits)
+
+
+FUNCTIONS = {
+    "sqrt": math.sqrt, "abs": abs, "round": _round, "log": math.log, "log10": math.log10,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan, "exp": math.exp,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+MAX_EXPONENT = 1000
+MAX_DIGITS = 308        # results past float range are refused, not computed
+
+# Linear units: factor to the base unit of their dimension
+UNITS = {
+    # length (m)
+    "mm": ("length", 0.001), "cm": ("length", 0.01), "m": ("length", 1.0), "km": ("length", 1000.0),
+    "in": ("length", 0.0254), "inch": ("length", 0.0254), "inches": ("length", 0.0254),
+    "ft": ("length", 0.3048), "foot": ("length", 0.3048), "feet": ("length", 0.3048),
+    "yd": ("length", 0.9144), "mi": ("length", 1609.344), "mile": ("length", 1609.344), "miles": ("length", 1609.344),
+    # mass (kg)
+    "g": ("mass", 0.001), "kg": ("mass", 1.0), "lb": ("mass", 0.45359237), "lbs": ("mass", 0.45359237),
+    "oz": ("mass", 0.028349523125),
+    # data (bytes)
+    "b": ("data", 1.0), "kb": ("data", 1024.0), "mb": ("data", 1024.0 ** 2), "gb": ("data", 1024.0 ** 3),
+    "tb": ("data", 1024.0 ** 4),
+    # time (s)
+    "s": ("time", 1.0), "sec": ("time", 1.0), "min": ("time", 60.0), "h": ("time", 3600.0),
+    "hr": ("time", 3600.0), "hours": ("time", 3600.0), "day": ("time", 86400.0), "days": ("time", 86400.0),
+}
+TEMPERATURES = {"c", "f", "k", "°c", "°f", "celsius", "fahrenheit", "kelvin"}
+
+CONVERSION = re.compile(r"^\s*(-?[\d.]+)\s*([a-z°]+)\s+(?:to|in)\s+([a-z°]+)\s*$", re.IGNORECASE)
+LOOKS_LIKE_MATH = re.compile(r"\d\s*[-+*/%^]|\b(?:sqrt|log|sin|cos|tan|exp)\s*\(")
+
+
+def format_number(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.6g}"
+
+
+def _eval(node):
+    if isinstance(node, ast.Expression):
+        return _eval(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in BIN_OPS:
+        left, right = _eval(node.left), _eval(node.right)
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > MAX_EXPONENT:
+                raise ValueError("exponent too large")
+            # Estimate the result's size before computing it: 999999**1000 is instant, its **1000 is not
+            if abs(left) > 1 and math.log10(abs(left)) * right > MAX_DIGITS:
+                raise ValueError("result too large")
+        return BIN_OPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+        return UNARY_OPS[type(node.op)](_eval(node.operand))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS:
+        return FUNCTIONS[node.func.id](*[_eval(arg) for arg in node.args])
+    if isinstance(node, ast.Name) and node.id in CONSTANTS:
+        return CONSTANTS[node.id]
+    raise ValueError("unsupported expression")
+
+
+def evaluate(expression):
+    """ Returns the numeric value of an arithmetic expression, or None. """
+    if not LOOKS_LIKE_MATH.search(expression):
+        return None
+    expression = expression.replace("^", "**").replace("×", "*").replace("÷", "/")
+    try:
+        return _eval(ast.parse(expression.strip(), mode="eval"))
+    except (SyntaxError, ValueError, TypeError, ZeroDivisionError, OverflowError):
+        return None
+
+
+def _to_celsius(value, unit):
+    unit = unit.lstrip("°")[0]
+    if unit == "c": return value
+    if unit == "f": return (value - 32) * 5 / 9
+    return value - 273.15
+
+
+def _from_celsius(value, unit):
+    unit = unit.lstrip("°")[0]
+    if unit == "c": return value
+    if unit == "f": return value * 9 / 5 + 32
+    return value + 273.15
+
+
+def convert(query):
+    """ '5 km to miles' -> (value, unit), or None when it is not a conversion. """
+    match = CONVERSION.match(query)
+    if not match:
+        return None
+    try:
+        value = float(match.group(1))
+    except ValueError:
+        return None
+    src, dst = match.group(2).lower(), match.group(3).lower()
+
+    if src in TEMPERATURES and dst in TEMPERATURES:
+        return _from_celsius(_to_celsius(value, src), dst), match.group(3)
+    if src in UNITS and dst in UNITS and UNITS[src][0] == UNITS[dst][0]:
+        return value * UNITS[src][1] / UNITS[dst][1], match.group(3)
+    return None
+
+
+def answer(query):
+    """ Inline answer text for a math or unit-conversion query, or None. """
+    converted = convert(query)
+    if converted is not None:
+        value, unit = converted
+        return f"{format_number(value)} {unit}"
+
+    value = evaluate(query)
+    if value is not None:
+        if isinstance(value, float) and not math.isfinite(value):
+            return None     # 1e308*10 -> inf is not an answer
+        try:
+            return format_number(value)
+        except OverflowError:   # e.g. an int product too large for a float
+            return None
+    return None
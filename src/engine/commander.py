@@ -1,55 +1,136 @@
 import os
 import subprocess
 import ctypes
-import webbrowser
+import time
 import shutil
-import difflib
+import threading
+from src.engine.lazy import lazy_import
+from src.engine.scheduler import get_scheduler, PREFETCH, BACKGROUND
 from src.engine.knowledge_base import INTENT_DB
+from src.engine.app_sources import default_sources, launch
+from src.engine.providers import (ProviderHub, SearchContext, RecentItems, CalculatorProvider, IntentProvider,
+                                  AppProvider, FileSearchProvider, RecentProvider, WebSearchProvider)
+
+webbrowser = lazy_import("webbrowser")
+
+class AppSnapshot:
+    """ One scan's results. Replaced whole, never mutated (except the resolve cache). """
+    def __init__(self, entries=None):
+        self.entries = entries or {}    # name -> AppEntry (winning source)
+        self.app_map = {name: entry.path for name, entry in self.entries.items()}   # name -> path
+        self.resolved = {}              # query -> path or None (resolved-executable cache)
 
 class AppIndexer:
-    def __init__(self):
-        self.app_map = {} 
-        self.scan_start_menu()
-
-    def scan_start_menu(self):
-        paths = [
-            os.path.join(os.environ['ProgramData'], r'Microsoft\Windows\Start Menu\Programs'),
-            os.path.join(os.environ['APPDATA'], r'Microsoft\Windows\Start Menu\Programs')
-        ]
-        
-        # Also auto-add common windows apps that might not have shortcuts
-        self.app_map["notepad"] = "notepad.exe"
-        self.app_map["calculator"] = "calc.exe"
-        self.app_map["cmd"] = "cmd.exe"
-        self.app_map["powershell"] = "powershell.exe"
-        self.app_map["explorer"] = "explorer.exe"
-
-        for root_path in paths:
-            if not os.path.exists(root_path): continue
-            for root, dirs, files in os.walk(root_path):
-                for file in files:
-                    if file.endswith(".lnk"):
-                        name = file.lower().replace(".lnk", "")
-                        self.app_map[name] = os.path.join(root, file)
-
-    def fuzzy_find(self, query):
+    RESCAN_INTERVAL = 600   # seconds before maybe_rescan() crawls again
+
+    def __init__(self, sources=None):
+        self.sources = default_sources() if sources is None else sources
+        # A rescan swaps in a new snapshot: readers grab it once per call
+        self.snapshot = AppSnapshot()
+        self._lock = threading.Lock()
+        self.scanned_at = 0.0
+        self.rescan = None
+        self.resolve_hits = 0       # resolve() cache counters (for replay/benchmarks)
+        self.resolve_misses = 0
+        self.scan()
+
+    def scan(self):
+        """
+        Scans every source concurrently (prefetch priority: the user is about
+        to search these) and merges the results.
+        """
+        scheduler = get_scheduler()
+        futures = [(source, scheduler.submit(source.scan, priority=PREFETCH)) for source in self.sources]
+        self.merge([(source, future.result) for source, future in futures])
+
+    def maybe_rescan(self):
+        """ Re-crawls as a background job once the index is older than RESCAN_INTERVAL. """
+        if time.monotonic() - self.scanned_at < self.RESCAN_INTERVAL:
+            return
+        if self.rescan is None or self.rescan.done():
+            # One job, sources in sequence: nested background jobs could starve each other
+            self.rescan = get_scheduler().submit(
+                lambda: self.merge([(source, source.scan) for source in self.sources]), priority=BACKGROUND
+            )
+
+    def merge(self, results):
+        """
+        Merges [(source, get_entries)] into the index.
+        When two sources know the same name, the lower PRIORITY wins; at equal
+        priority the first entry seen wins (sources list their preferred folders first).
+        """
+        entries = {}
+        for source, get_entries in results:
+            try:
+                found = get_entries()
+            except Exception as e:
+                print(f"Warning: App source '{source.NAME}' failed. Error: {e}")
+                continue
+            for entry in found:
+                current = entries.get(entry.name)
+                if current is None or entry.priority < current.priority:
+                    entries[entry.name] = entry
+
+        snapshot = AppSnapshot(entries)
+        with self._lock:
+            self.snapshot = snapshot
+            self.scanned_at = time.monotonic()
+
+    @property
+    def app_map(self):
+        return self.snapshot.app_map
+
+    @property
+    def entries(self):
+        return self.snapshot.entries
+
+    def fuzzy_find(self, query, snapshot=None):
         if not query: return None
         query = query.lower()
+        snapshot = snapshot or self.snapshot
+        app_map = snapshot.app_map
         
         # 1. Exact Access
-        if query in self.app_map: return self.app_map[query]
+        if query in app_map: return app_map[query]
         
-        # 2. Substring Search
-        candidates = [name for name in self.app_map if query in name]
+        # 2. Substring Search (shortest name, then best source)
+        candidates = [name for name in app_map if query in name]
         if candidates:
-            candidates.sort(key=len)
-            return self.app_map[candidates[0]]
+            candidates.sort(key=lambda name: (len(name), snapshot.entries[name].priority))
+            return app_map[candidates[0]]
             
         return None
 
+    def resolve(self, query):
+        """
+        fuzzy_find() + shutil.which(), memoized (misses included) until the next scan.
+        """
+        if not query: return None
+        key = query.lower()
+        snapshot = self.snapshot
+        if key in snapshot.resolved:
+            self.resolve_hits += 1
+            return snapshot.resolved[key]
+
+        self.resolve_misses += 1
+        path = self.fuzzy_find(key, snapshot) or shutil.which(query)
+        snapshot.resolved[key] = path
+        return path
+
 class Commander:
+    DIRECT_ACTIONS = ("system_uri", "key_press", "win_api", "cmd_exec")
+
     def __init__(self):
         self.indexer = AppIndexer()
+        self.recent = RecentItems()
+        self.hub = ProviderHub([
+            CalculatorProvider(),
+            IntentProvider(self.indexer),
+            AppProvider(self.indexer),
+            RecentProvider(self.recent),
+            FileSearchProvider(),
+            WebSearchProvider(),
+        ])
 
     def execute(self, intent_id, entity):
         print(f"Commander received: {intent_id} -> {entity}")
@@ -74,39 +155,20 @@ class Commander:
             
         return "Action not implemented."
 
-    def fetch_candidates(self, intent_id, entity):
-        candidates = []
-        
-        if intent_id == "WEB_SEARCH":
-            candidates.append({
-                "name": f"Search Google for '{entity}'",
-                "path": f"web_search:{entity}",
-                "type": "action"
-            })
-            return candidates
-
-        if intent_id in INTENT_DB:
-            intent_data = INTENT_DB[intent_id]
-            targets = intent_data.get("targets", [])
-            
-            # Category lookups
-            if intent_data["action"] == "open_priority_app":
-                for app_name in targets:
-                    path = self.indexer.fuzzy_find(app_name)
-                    if path:
-                        display_name = os.path.splitext(os.path.basename(path))[0]
-                        # Dedup check
-                        if not any(c['path'] == path for c in candidates):
-                            candidates.append({"name": display_name, "path": path, "type": "app"})
-        
-        # Generic fallback
-        if not candidates and entity:
-            path = self.indexer.fuzzy_find(entity)
-            if path:
-                display_name = os.path.splitext(os.path.basename(path))[0]
-                candidates.append({"name": display_name, "path": path, "type": "app"})
+    def is_direct_action(self, intent_id):
+        """ System intents (volume, lock, settings...) run immediately instead of listing results. """
+        return INTENT_DB.get(intent_id, {}).get("action") in self.DIRECT_ACTIONS
+
+    def fetch_candidates(self, intent_id, entity, query=None, score=1.0):
+        """ Blocking: merged results from every provider that answers within its deadline. """
+        return self.hub.search(SearchContext(query or entity, intent_id, score, entity))
 
-        return candidates
+    def stream_candidates(self, query, intent_id, score, entity, on_update, on_done=None):
+        """
+        Non-blocking: on_update(results) fires (from a worker thread) each time a
+        provider finishes; returns a SearchHandle whose cancel() drops the search.
+        """
+        return self.hub.stream(SearchContext(query, intent_id, score, entity), on_update, on_done)
 
     def handle_priority_app(self, target_list):
         """
@@ -117,7 +179,8 @@ class Commander:
             path = self.indexer.fuzzy_find(app_name)
             if path:
                 try:
-                    os.startfile(path)
+                    launch(path)
+                    self.recent.add(app_name, path)
                     return f"Launching {app_name}..."
                 except: continue
         
@@ -130,17 +193,17 @@ class Commander:
             webbrowser.open(f"https://www.google.com/search?q={query}")
             return f"Opened Google Search for: {query}"
 
-        # 2. App Indexer
-        path = self.indexer.fuzzy_find(app_name)
+        # 2. Path from a suggestion, else App Indexer / PATH (cached lookup, no shell probe)
+        path = app_name if os.path.isfile(app_name) else self.indexer.resolve(app_name)
         if path:
-            os.startfile(path)
-            return f"Launching {app_name}..."
-        
-        try:
-            os.startfile(app_name)
-            return f"Launching command '{app_name}'..."
-        except:
-            return f"Could not find app '{app_name}'."
+            try:
+                launch(path)
+                self.recent.add(os.path.splitext(os.path.basename(path))[0], path)
+                return f"Launching {app_name}..."
+            except OSError:
+                pass
+
+        return f"Could not find app '{app_name}'."
 
     def handle_uri(self, uri):
         try:
@@ -0,0 +1,172 @@
+import os
+import json
+import hashlib
+import threading
+from src.engine.lazy import lazy_import
+from src.engine.paths import CACHE_DIR, ensure_dir
+from src.engine.knowledge_base import pack_paths
+from src.engine.lexical import LexicalClassifier
+from src.engine.vector_index import make_index
+from src.engine.scheduler import get_scheduler
+
+np = lazy_import("numpy")
+
+# Bump when the on-disk layout of the artifact changes
+ARTIFACT_VERSION = 1
+ARTIFACT_PATH = os.path.join(CACHE_DIR, "intent_index.npz")
+
+
+def normalize_trigger(text):
+    return " ".join(text.lower().split())
+
+
+def db_fingerprint(intent_db):
+    blob = json.dumps(intent_db, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(blob).hexdigest()
+
+
+class CompiledIntentIndex:
+    """
+    Immutable snapshot of everything the classifier derives from INTENT_DB:
+      - embeddings:  (n_triggers, dim) float32 prototype matrix
+      - intent_ids:  intent of each row
+      - triggers:    normalized trigger text of each row
+      - vocab:       spell-check vocabulary (rebuilt from triggers, not persisted)
+      - trigger_map: exact trigger -> intent_id matcher
+      - lexical:     stage-one n-gram classifier (cheap to rebuild, not persisted)
+      - vectors:     vector index over the embeddings (row number = vector id)
+    The classifier swaps whole instances, so readers never see a half-built index.
+    """
+    def __init__(self, embeddings, intent_ids, triggers, fingerprint, model_tag=""):
+        self.embeddings = embeddings
+        self.intent_ids = list(intent_ids)
+        self.triggers = list(triggers)
+        self.fingerprint = fingerprint
+        self.model_tag = model_tag
+
+        self.trigger_map = {}
+        self.vocab = set()
+        for trigger, intent_id in zip(self.triggers, self.intent_ids):
+            self.trigger_map.setdefault(trigger, intent_id)
+            self.vocab.update(trigger.split())
+        self.lexical = LexicalClassifier(self.triggers, self.intent_ids)
+
+        self.vectors = None
+        if len(self.triggers):
+            self.vectors = make_index(embeddings.shape[1], expected_size=len(self.triggers))
+            self.vectors.add(np.arange(len(self.triggers)), embeddings)
+
+    def __len__(self):
+        return len(self.triggers)
+
+    def embedding_cache(self):
+        """ {trigger: embedding} used to skip re-embedding unchanged triggers. """
+        return {t: self.embeddings[i] for i, t in enumerate(self.triggers)}
+
+    def save(self, path=ARTIFACT_PATH):
+        ensure_dir(os.path.dirname(path))
+        meta = {
+            "artifact_version": ARTIFACT_VERSION,
+            "fingerprint": self.fingerprint,
+            "model_tag": self.model_tag,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                embeddings=self.embeddings,
+                intent_ids=np.array(self.intent_ids, dtype=str),
+                triggers=np.array(self.triggers, dtype=str),
+                meta=np.array(json.dumps(meta)),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=ARTIFACT_PATH):
+        """ Returns None when the artifact is missing, corrupt or from another version. """
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("artifact_version") != ARTIFACT_VERSION:
+                    return None
+                return cls(
+                    data["embeddings"].astype(np.float32),
+                    data["intent_ids"].tolist(),
+                    data["triggers"].tolist(),
+                    meta["fingerprint"],
+                    meta.get("model_tag", ""),
+                )
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable intent index {path}. Error: {e}")
+            return None
+
+
+def compile_index(intent_db, encode_batch, previous=None, model_tag=""):
+    """
+    Builds a CompiledIntentIndex, re-using embeddings from `previous`
+    for every trigger whose text did not change.
+    """
+    cache = {}
+    if previous is not None and previous.model_tag == model_tag:
+        cache = previous.embedding_cache()
+
+    intent_ids, triggers = [], []
+    for intent_id, data in intent_db.items():
+        for trigger in data["triggers"]:
+            intent_ids.append(intent_id)
+            triggers.append(normalize_trigger(trigger))
+
+    fresh = sorted({t for t in triggers if t not in cache})
+    if fresh:
+        print(f"Embedding {len(fresh)} new trigger(s)...")
+        for start in range(0, len(fresh), 32):
+            get_scheduler().checkpoint() # Re-embedding in the background yields to queries
+            chunk = fresh[start:start + 32]
+            cache.update(zip(chunk, encode_batch(chunk)))
+
+    if triggers:
+        embeddings = np.vstack([cache[t] for t in triggers]).astype(np.float32)
+    else:
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+
+    return CompiledIntentIndex(embeddings, intent_ids, triggers, db_fingerprint(intent_db), model_tag)
+
+
+class PackWatcher(threading.Thread):
+    """
+    Polls the intent pack folders and fires `on_change` when a pack is
+    added, removed or modified. Polling keeps us free of watchdog/pywin32 hooks.
+    """
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, on_change, dirs=None):
+        super().__init__(daemon=True)
+        self.on_change = on_change
+        self.dirs = dirs
+        self._stop_event = threading.Event()
+        self._snapshot = self.snapshot()
+
+    def snapshot(self):
+        state = {}
+        for path in pack_paths(self.dirs):
+            try:
+                stat = os.stat(path)
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return state
+
+    def run(self):
+        while not self._stop_event.wait(self.POLL_INTERVAL):
+            current = self.snapshot()
+            if current != self._snapshot:
+                self._snapshot = current
+                try:
+                    self.on_change()
+                except Exception as e:
+                    print(f"Intent reload failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()
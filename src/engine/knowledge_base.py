@@ -1,79 +1,88 @@
 # The Brains: Valid Intents and their Metadata
+#
+# Intents live in "packs" (JSON or YAML files) instead of code:
+#   - src/engine/intents/*.json   -> built-in packs shipped with NovaDesk
+#   - ~/.novadesk/intents/*.json  -> user packs (override built-ins by intent id)
+#
+# Pack format:
+#   {"name": "core", "version": 1,
+#    "intents": {"APP_BROWSER": {"triggers": [...], "action": "...", "targets": [...]}}}
 
-INTENT_DB = {
-    # --- Applications (Category: open_known) ---
-    "APP_BROWSER": {
-        "triggers": ["open browser", "start internet", "launch chrome", "go online", "open web"],
-        "action": "open_priority_app",
-        "targets": ["chrome", "edge", "firefox", "brave", "opera", "vivaldi"] 
-    },
-    "APP_MUSIC": {
-        "triggers": ["open music", "play tunes", "start spotify", "launch apple music", "play music"],
-        "action": "open_priority_app",
-        "targets": ["spotify", "music", "itunes", "vlc", "media player", "aimp"] 
-    },
-    "APP_CODE": {
-        "triggers": ["open code", "start coding", "launch vscode", "open editor", "start ide"],
-        "action": "open_priority_app",
-        "targets": ["visual studio code", "notepad", "sublime", "pycharm", "cursor", "atom", "intellij"]
-    },
-    "APP_TERMINAL": {
-        "triggers": ["open terminal", "start cmd", "open powershell", "command prompt", "run cli"],
-        "action": "open_priority_app",
-        "targets": ["alacritty", "windowsterminal", "powershell", "cmd", "git bash"]
-    },
-    "APP_SETTINGS": {
-        "triggers": ["open settings", "change preferences", "system config", "control panel"],
-        "action": "system_uri",
-        "targets": ["ms-settings:", "control"]
-    },
-    "APP_FILES": {
-        "triggers": ["open files", "file explorer", "show documents", "my computer", "explore"],
-        "action": "system_uri",
-        "targets": ["explorer"]
-    },
-    "APP_CALC": {
-        "triggers": ["open calculator", "calc", "do math"],
-        "action": "open_priority_app",
-        "targets": ["calculator", "calc"]
-    },
-
-    # --- System Control (Category: system) ---
-    "SYS_VOLUME_UP": {
-        "triggers": ["volume up", "louder", "increase sound", "turn up"],
-        "action": "key_press",
-        "targets": ["volume_up"]
-    },
-    "SYS_VOLUME_DOWN": {
-        "triggers": ["volume down", "quieter", "lower sound", "turn down"],
-        "action": "key_press",
-        "targets": ["volume_down"]
-    },
-    "SYS_MUTE": {
-        "triggers": ["mute", "silence", "shut up", "no sound"],
-        "action": "key_press",
-        "targets": ["volume_mute"]
-    },
-    "SYS_LOCK": {
-        "triggers": ["lock pc", "lock screen", "secure computer", "away"],
-        "action": "win_api",
-        "targets": ["lock_workstation"]
-    },
-    "SYS_SHUTDOWN": {
-        "triggers": ["shutdown", "turn off computer", "power off"],
-        "action": "cmd_exec",
-        "targets": ["shutdown /s /t 10"]
-    },
-    
-    # --- Generic Fallbacks ---
-    "GENERIC_OPEN": {
-        "triggers": ["open", "launch", "start", "run"],
-        "action": "generic_search", # Will use spaCy entity extraction
-        "targets": []
-    },
-    "GENERIC_SEARCH": {
-        "triggers": ["find", "search for", "where is", "locate"],
-        "action": "file_search",
-        "targets": []
-    }
-}
+import os
+import json
+from src.engine.paths import BUILTIN_INTENT_DIR, USER_INTENT_DIR
+
+PACK_EXTENSIONS = (".json", ".yaml", ".yml")
+
+
+def pack_paths(dirs=None):
+    """
+    Lists every pack file, built-ins first so user packs win on conflicts.
+    """
+    if dirs is None:
+        dirs = [BUILTIN_INTENT_DIR, USER_INTENT_DIR]
+
+    paths = []
+    for folder in dirs:
+        if not os.path.isdir(folder): continue
+        for file in sorted(os.listdir(folder)):
+            if file.lower().endswith(PACK_EXTENSIONS):
+                paths.append(os.path.join(folder, file))
+    return paths
+
+
+def is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def load_pack(path):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            pack = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                print(f"Warning: PyYAML not installed, skipping pack {path}")
+                return {}
+            pack = yaml.safe_load(f) or {}
+
+    intents = pack.get("intents", {})
+    for intent_id, data in intents.items():
+        if "triggers" not in data or "action" not in data:
+            raise ValueError(f"Intent '{intent_id}' in {path} needs 'triggers' and 'action'")
+        data.setdefault("targets", [])
+        # "triggers": "open notes" would otherwise become the triggers 'o', 'p', 'e', ...
+        if not is_string_list(data["triggers"]) or not is_string_list(data["targets"]):
+            raise ValueError(f"Intent '{intent_id}' in {path}: 'triggers' and 'targets' must be lists of strings")
+    return intents
+
+
+def load_intent_db(paths=None):
+    """
+    Merges all packs into a single {intent_id: data} dict.
+    A broken pack is skipped (with a warning) rather than taking the app down.
+    """
+    if paths is None:
+        paths = pack_paths()
+
+    db = {}
+    for path in paths:
+        try:
+            db.update(load_pack(path))
+        except Exception as e:
+            print(f"Warning: Could not load intent pack {path}. Error: {e}")
+    return db
+
+
+def refresh_intent_db(new_db):
+    """
+    Updates INTENT_DB in place so modules holding a reference
+    (Commander, ...) see hot-reloaded intents.
+    """
+    INTENT_DB.update(new_db)
+    for intent_id in [k for k in INTENT_DB if k not in new_db]:
+        del INTENT_DB[intent_id]
+
+
+INTENT_DB = load_intent_db()
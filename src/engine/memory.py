@@ -0,0 +1,80 @@
+import os
+import sys
+import gc
+import time
+import ctypes
+import threading
+
+
+def current_rss():
+    """ Resident set size of this process in bytes (0 if unknown). """
+    try:
+        if sys.platform == "win32":
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+            return counters.WorkingSetSize
+
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+def format_rss(num_bytes):
+    return f"{num_bytes / (1024 * 1024):.0f} MB"
+
+
+def release_memory():
+    """ Collects garbage and hands freed heap pages back to the OS where possible. """
+    gc.collect()
+    if sys.platform.startswith("linux"):
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except Exception:
+            pass
+
+
+class IdleMonitor(threading.Thread):
+    """
+    Calls `on_idle` once `last_used()` is more than `timeout` seconds in the past.
+    It fires again only after the next activity, so unloading never loops.
+    """
+    def __init__(self, last_used, on_idle, timeout):
+        super().__init__(daemon=True)
+        self.last_used = last_used
+        self.on_idle = on_idle
+        self.timeout = timeout
+        self._stop_event = threading.Event()
+
+    def run(self):
+        fired_for = None
+        poll = min(self.timeout, 30.0)
+        while not self._stop_event.wait(poll):
+            last = self.last_used()
+            if last != fired_for and time.monotonic() - last >= self.timeout:
+                fired_for = last
+                try:
+                    self.on_idle()
+                except Exception as e:
+                    print(f"Idle unload failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()
@@ -1,61 +1,206 @@
 import os
-import numpy as np
-import onnxruntime as ort
-from tokenizers import Tokenizer
-import spacy
-import difflib
-from src.engine.knowledge_base import INTENT_DB
+import time
+import threading
+from src.engine.lazy import lazy_import
+from src.engine.knowledge_base import INTENT_DB, load_intent_db, refresh_intent_db
+from src.engine.intent_index import CompiledIntentIndex, PackWatcher, compile_index, db_fingerprint, normalize_trigger
+from src.engine.paths import MODEL_DIR
+from src.engine.memory import IdleMonitor, current_rss, format_rss, release_memory
+from src.engine.batching import BatchingEncoder
+from src.engine.scheduler import get_scheduler, INTERACTIVE, PREFETCH, BACKGROUND
+
+# Heavy dependencies are deferred until the classifier is actually built
+np = lazy_import("numpy")
+ort = lazy_import("onnxruntime")
+tokenizers = lazy_import("tokenizers")
+spacy = lazy_import("spacy")
+difflib = lazy_import("difflib")
+
+MODEL_VARIANTS = ("model_mmap.onnx", "model_pooled.onnx", "model.onnx")
+POOLED_OUTPUT = "sentence_embedding"
 
 class IntentClassifier:
+    # Stage-one (lexical) answers are trusted when they beat the runner-up
+    # intent by this margin; anything closer goes to MiniLM.
+    CASCADE_MARGIN = 0.15
+    CASCADE_MIN_SCORE = 0.5
+
+    # Low-memory mode: free the ONNX session + spaCy after this many idle
+    # seconds (0 = keep them resident). The compiled index always stays.
+    IDLE_UNLOAD_SECONDS = float(os.environ.get("NOVADESK_IDLE_UNLOAD", 0))
+
+    # Concurrency: one batched ONNX run at a time, each using ORT_THREADS cores.
+    # Leave the rest for the UI, spaCy and the other predict() threads.
+    ORT_THREADS = max(1, min(4, (os.cpu_count() or 2) // 2))
+    BATCH_WINDOW_MS = 2.0
+    MAX_BATCH = 32
+    MAX_PENDING = 256
+
     def __init__(self):
         """
         Initialize the NLP engine using ONNX Runtime (Intent) + spaCy (Entity).
         Backed by the detailed Knowledge Base.
         """
-        print("Loading ONNX Model...")
-        model_path = os.path.join("src", "engine", "model_cache", "onnx", "model.onnx")
-        tokenizer_path = os.path.join("src", "engine", "model_cache", "tokenizer.json")
+        # Preferred model variants, best first:
+        #   model_mmap.onnx   - external-data weights, memory-mapped (scripts/prepare_mmap_model.py)
+        #   model_pooled.onnx - pooling + L2-norm fused into the graph (scripts/fuse_pooling.py)
+        #   model.onnx        - stock export, pooled in NumPy
+        for name in MODEL_VARIANTS:
+            self.model_path = os.path.join(MODEL_DIR, "onnx", name)
+            if os.path.exists(self.model_path):
+                break
+        tokenizer_path = os.path.join(MODEL_DIR, "tokenizer.json")
         
-        self.tokenizer = Tokenizer.from_file(tokenizer_path)
-        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]", length=512)
+        self.tokenizer = tokenizers.Tokenizer.from_file(tokenizer_path)
+        # Pad to the longest query in the batch, not 512: the output tensor scales with it
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
         self.tokenizer.enable_truncation(max_length=512)
+
+        self.session = None
+        self.fused_pooling = False
+        self.nlp_spacy = None
+        self._model_lock = threading.RLock()
+        self._spacy_lock = threading.Lock() # spaCy pipelines are not thread-safe
+        self.batcher = BatchingEncoder(
+            self.encode_batch, max_batch=self.MAX_BATCH,
+            window_ms=self.BATCH_WINDOW_MS, max_pending=self.MAX_PENDING
+        )
+        self.last_used = time.monotonic()
+        self.warming = None     # the pending warm_up() reload, if any
+        self._warm_lock = threading.Lock() # not _model_lock: a reload holds that for seconds
+        self.load_models()
         
-        sess_options = ort.SessionOptions()
-        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-        self.session = ort.InferenceSession(model_path, sess_options)
-        
-        print("Loading spaCy Model...")
-        self.nlp_spacy = spacy.load("en_core_web_sm")
-        
-        # --- Pre-compute Knowledge Base Embeddings & Vocabulary ---
-        self.intent_prototypes = [] 
-        self.vocab = set()
-        
+        # --- Knowledge Base Embeddings & Vocabulary (compiled artifact) ---
+        # Tagged with the model file so a new model invalidates cached embeddings
+        stat = os.stat(self.model_path)
+        self.model_tag = f"{stat.st_size}:{stat.st_mtime_ns}"
+        self._reload_lock = threading.Lock()
+        self.watcher = None
+        self.idle_monitor = None
+
         print("Indexing Knowledge Base...")
-        for intent_id, data in INTENT_DB.items():
-            for trigger in data["triggers"]:
-                # 1. Embeddings
-                emb = self.encode(trigger)
-                self.intent_prototypes.append((emb, intent_id))
-                
-                # 2. Build Vocabulary for Spell Checker
-                words = trigger.lower().split()
-                self.vocab.update(words)
+        cached = CompiledIntentIndex.load()
+        if cached and cached.model_tag == self.model_tag and cached.fingerprint == db_fingerprint(INTENT_DB):
+            self.index = cached
+        else:
+            self.index = compile_index(INTENT_DB, self.encode_batch, previous=cached, model_tag=self.model_tag)
+            self.index.save()
+
+    def load_models(self):
+        """ Loads the ONNX session and spaCy pipeline (no-op if already resident). """
+        with self._model_lock:
+            if self.session is not None and self.nlp_spacy is not None:
+                return
+            rss_before = current_rss()
+
+            if self.session is None:
+                print("Loading ONNX Model...")
+                sess_options = ort.SessionOptions()
+                sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                sess_options.intra_op_num_threads = self.ORT_THREADS
+                sess_options.inter_op_num_threads = 1
+                session = ort.InferenceSession(self.model_path, sess_options)
+                self.fused_pooling = any(o.name == POOLED_OUTPUT for o in session.get_outputs())
+                self.session = session
+
+            if self.nlp_spacy is None:
+                print("Loading spaCy Model...")
+                self.nlp_spacy = spacy.load("en_core_web_sm")
+
+            print(f"Models loaded (RSS {format_rss(rss_before)} -> {format_rss(current_rss())})")
+
+    def unload_models(self):
+        """ Frees the ONNX session and spaCy; the next query (or warm_up) reloads them. """
+        with self._model_lock:
+            if self.session is None and self.nlp_spacy is None:
+                return
+            rss_before = current_rss()
+            self.session = None
+            self.nlp_spacy = None
+            release_memory()
+            print(f"Models unloaded after idle (RSS {format_rss(rss_before)} -> {format_rss(current_rss())})")
+
+    @property
+    def models_loaded(self):
+        return self.session is not None and self.nlp_spacy is not None
+
+    def warm_up(self):
+        """
+        Called on hotkey/keypress: marks activity and, if the models were
+        unloaded, reloads them as prefetch work (ahead of indexing).
+        Single-flight: keystrokes during a reload don't queue more.
+        """
+        self.last_used = time.monotonic()
+        if self.models_loaded:
+            return
+        with self._warm_lock:
+            if self.warming is None or self.warming.done():
+                self.warming = get_scheduler().submit(self.load_models, priority=PREFETCH)
+
+    def start_idle_unloading(self):
+        """ Enables low-memory mode when IDLE_UNLOAD_SECONDS is set. """
+        if self.IDLE_UNLOAD_SECONDS > 0 and self.idle_monitor is None:
+            self.idle_monitor = IdleMonitor(lambda: self.last_used, self.unload_models, self.IDLE_UNLOAD_SECONDS)
+            self.idle_monitor.start()
+
+    def get_session(self):
+        self.last_used = time.monotonic()
+        session = self.session
+        if session is None:
+            with self._model_lock:
+                self.load_models()
+                session = self.session
+        return session
+
+    def get_spacy(self):
+        self.last_used = time.monotonic()
+        nlp_spacy = self.nlp_spacy
+        if nlp_spacy is None:
+            with self._model_lock:
+                self.load_models()
+                nlp_spacy = self.nlp_spacy
+        return nlp_spacy
+
+    @property
+    def vocab(self):
+        return self.index.vocab
+
+    def reload_intents(self):
+        """
+        Re-reads the intent packs, re-embeds only the changed triggers and
+        swaps the new index in. In-flight predict() calls keep the old one.
+        """
+        with self._reload_lock:
+            new_db = load_intent_db()
+            if db_fingerprint(new_db) == self.index.fingerprint:
+                return
+            new_index = compile_index(new_db, self.encode_batch, previous=self.index, model_tag=self.model_tag)
+            self.index = new_index
+            refresh_intent_db(new_db)
+            new_index.save()
+            print(f"Intent packs reloaded ({len(new_index)} triggers).")
+
+    def start_watching(self):
+        """ Hot-reload intent packs when they change on disk (re-embedding runs as background work). """
+        if self.watcher is None:
+            self.watcher = PackWatcher(lambda: get_scheduler().submit(self.reload_intents, priority=BACKGROUND))
+            self.watcher.start()
 
     def correct_query(self, query):
         """
         Domain-Specific Auto-Correct.
         Fixes 'broswer' -> 'browser', 'sappotify' -> 'spotify' (if in vocab).
         """
+        vocab = self.vocab
         words = query.lower().split()
         corrected_words = []
         
         for word in words:
-            if word in self.vocab:
+            if word in vocab:
                 corrected_words.append(word)
             else:
                 # Try to find a close match in our domain vocabulary
-                matches = difflib.get_close_matches(word, self.vocab, n=1, cutoff=0.8)
+                matches = difflib.get_close_matches(word, vocab, n=1, cutoff=0.8)
                 if matches:
                     print(f"Auto-Correct: {word} -> {matches[0]}")
                     corrected_words.append(matches[0])
@@ -64,11 +209,12 @@ class IntentClassifier:
                     
         return " ".join(corrected_words)
 
-    def encode(self, text):
-        encoded = self.tokenizer.encode(text)
-        input_ids = np.array([encoded.ids], dtype=np.int64)
-        attention_mask = np.array([encoded.attention_mask], dtype=np.int64)
-        token_type_ids = np.array([encoded.type_ids], dtype=np.int64)
+    def encode_batch(self, texts):
+        """ Embeds a list of texts in one ONNX call; returns a (len(texts), 384) array. """
+        encoded = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        token_type_ids = np.array([e.type_ids for e in encoded], dtype=np.int64)
         
         inputs = {
             'input_ids': input_ids, 
@@ -76,8 +222,12 @@ class IntentClassifier:
             'token_type_ids': token_type_ids
         }
         
-        outputs = self.session.run(None, inputs)
-        last_hidden_state = outputs[0]
+        session = self.get_session()
+        if self.fused_pooling:
+            # Graph already returns the normalized (batch, 384) sentence embeddings
+            return session.run([POOLED_OUTPUT], inputs)[0]
+
+        last_hidden_state = session.run([session.get_outputs()[0].name], inputs)[0]
         
         mask_expanded = np.expand_dims(attention_mask, -1)
         sum_embeddings = np.sum(last_hidden_state * mask_expanded, axis=1)
@@ -85,30 +235,74 @@ class IntentClassifier:
         mean_pooled = sum_embeddings / sum_mask
         
         norm = np.linalg.norm(mean_pooled, axis=1, keepdims=True)
-        return (mean_pooled / norm).flatten()
+        return mean_pooled / norm
+
+    def encode(self, text):
+        """
+        Thread-safe single-text embedding. Concurrent callers are coalesced
+        into one batched ONNX call by the BatchingEncoder.
+        """
+        return self.batcher.encode(text)
+
+    def encode_async(self, text):
+        """ Future-returning encode (wrap with asyncio.wrap_future in async code). """
+        return self.batcher.submit(text)
+
+    def predict_async(self, user_query):
+        """ Runs predict() as interactive work on the shared scheduler; concurrent queries share ONNX batches. """
+        return get_scheduler().submit(self.predict, user_query, priority=INTERACTIVE)
+
+    def classify_intent(self, user_query, cascade=True):
+        """
+        Returns (intent_id, score, stage) where stage is 'exact', 'lexical' or 'neural'.
+        With cascade=False the lexical stage is skipped (neural-only baseline).
+        """
+        # Grab the index once: a hot-reload may swap self.index mid-query
+        index = self.index
+
+        # 1. Exact trigger hit skips the transformer entirely
+        intent_id = index.trigger_map.get(normalize_trigger(user_query))
+        if intent_id is not None:
+            return intent_id, 1.0, "exact"
+
+        # 2. Cheap lexical model, trusted only when it is confident
+        if cascade:
+            intent_id, score, margin = index.lexical.predict(user_query)
+            if intent_id is not None and score >= self.CASCADE_MIN_SCORE and margin >= self.CASCADE_MARGIN:
+                return intent_id, score, "lexical"
+
+        # 3. MiniLM: compare against all KB triggers
+        if not len(index):
+            return None, -1.0, "neural"
+        rows, scores = index.vectors.search(self.encode(user_query), k=1)
+        return index.intent_ids[rows[0]], float(scores[0]), "neural"
+
+    def predict(self, user_query, timings=None):
+        """
+        Returns (intent_id, score, entity). Pass a dict as `timings` to get
+        per-stage milliseconds and the cascade stage back (trace replay).
+        """
+        t0 = time.perf_counter()
 
-    def predict(self, user_query):
         # 0. Auto-Correct Typo
         original_query = user_query
         user_query = self.correct_query(user_query)
         if user_query != original_query:
             print(f"Corrected: '{original_query}' -> '{user_query}'")
-            
-        query_embedding = self.encode(user_query)
-        
-        best_intent = None
-        highest_score = -1.0
-        
-        # Compare against all KB triggers
-        for prototype_emb, intent_id in self.intent_prototypes:
-            score = np.dot(query_embedding, prototype_emb)
-            if score > highest_score:
-                highest_score = score
-                best_intent = intent_id
-        
+        t1 = time.perf_counter()
+
+        best_intent, highest_score, stage = self.classify_intent(user_query)
+        t2 = time.perf_counter()
+
         # Entity Extraction (spaCy) is still valuable for Generic Intents
         # or if we need to refine a specific intent (e.g. "open music" -> entity="music")
         entity = self.extract_entity(user_query)
+
+        if timings is not None:
+            timings["correct"] = (t1 - t0) * 1000
+            timings["classify"] = (t2 - t1) * 1000
+            timings["entity"] = (time.perf_counter() - t2) * 1000
+            timings["stage"] = stage
         
         # Fallback Entity Logic
         if not entity:
@@ -118,7 +312,9 @@ class IntentClassifier:
         return best_intent, float(highest_score), entity
 
     def extract_entity(self, query):
-        doc = self.nlp_spacy(query)
+        nlp_spacy = self.get_spacy()
+        with self._spacy_lock:
+            doc = nlp_spacy(query)
         target_entity = ""
         
         for token in doc:
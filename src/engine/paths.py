@@ -0,0 +1,16 @@
+import os
+
+# Bundled, read-only assets (relative to the working directory, like the model cache)
+MODEL_DIR = os.path.join("src", "engine", "model_cache")
+BUILTIN_INTENT_DIR = os.path.join("src", "engine", "intents")
+
+# Per-user, writable state
+USER_DIR = os.environ.get("NOVADESK_HOME", os.path.join(os.path.expanduser("~"), ".novadesk"))
+USER_INTENT_DIR = os.path.join(USER_DIR, "intents")
+USER_APP_DIR = os.path.join(USER_DIR, "apps")
+CACHE_DIR = os.path.join(USER_DIR, "cache")
+
+
+def ensure_dir(path):
+    os.makedirs(path, exist_ok=True)
+    return path
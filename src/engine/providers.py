@@ -0,0 +1,351 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.engine import calculator
+from src.engine.knowledge_base import INTENT_DB
+from src.engine.paths import USER_DIR, ensure_dir
+from src.engine.scheduler import get_scheduler, INTERACTIVE
+
+
+def make_result(name, path, type, score):
+    return {"name": name, "path": path, "type": type, "score": score}
+
+
+class SearchContext:
+    """ What every provider gets: the raw query plus the classifier's reading of it. """
+    def __init__(self, query, intent_id=None, score=0.0, entity=""):
+        self.query = query
+        self.intent_id = intent_id
+        self.score = score
+        self.entity = entity
+
+    @property
+    def action(self):
+        return INTENT_DB.get(self.intent_id, {}).get("action")
+
+
+class ResultProvider:
+    """
+    One source of results. search() runs on the shared scheduler and must return
+    within DEADLINE_MS; long-running providers should poll `cancelled`
+    (a threading.Event) and return early once it is set.
+    """
+    NAME = "base"
+    DEADLINE_MS = 100
+    WEIGHT = 1.0        # multiplies the provider's own 0..1 scores when ranking
+
+    def search(self, context, cancelled):
+        raise NotImplementedError
+
+
+class CalculatorProvider(ResultProvider):
+    """ Inline math / unit conversion: answers in place of launching calc.exe. """
+    NAME = "calculator"
+    DEADLINE_MS = 50
+    WEIGHT = 1.0
+
+    def search(self, context, cancelled):
+        value = calculator.answer(context.query)
+        if value is None:
+            return []
+        return [make_result(f"= {value}", f"copy:{value}", "answer", 1.0)]
+
+
+class IntentProvider(ResultProvider):
+    """ Apps for category intents (APP_BROWSER -> chrome, edge, ...). """
+    NAME = "intent"
+    DEADLINE_MS = 100
+    WEIGHT = 0.9
+
+    def __init__(self, indexer):
+        self.indexer = indexer
+
+    def search(self, context, cancelled):
+        intent_data = INTENT_DB.get(context.intent_id)
+        if not intent_data or intent_data["action"] != "open_priority_app":
+            return []
+
+        results = []
+        for rank, app_name in enumerate(intent_data.get("targets", [])):
+            path = self.indexer.fuzzy_find(app_name)
+            if path:
+                display_name = os.path.splitext(os.path.basename(path))[0]
+                # Keep the knowledge base's priority order
+                results.append(make_result(display_name, path, "app", max(context.score, 0.0) - 0.01 * rank))
+        return results
+
+
+class AppProvider(ResultProvider):
+    """ Name matches against the whole app index. """
+    NAME = "apps"
+    DEADLINE_MS = 100
+    WEIGHT = 0.8
+    MAX_RESULTS = 5
+
+    def __init__(self, indexer):
+        self.indexer = indexer
+
+    def search(self, context, cancelled):
+        needle = (context.entity or context.query).lower().strip()
+        if len(needle) < 2:
+            return []
+
+        scored = []
+        for name, path in self.indexer.app_map.items():  # a snapshot: rescans replace it, never mutate it
+            if name == needle:
+                score = 1.0
+            elif name.startswith(needle):
+                score = 0.9
+            elif needle in name:
+                score = 0.7
+            else:
+                continue
+            # Shorter names are closer matches
+            scored.append((score - 0.001 * (len(name) - len(needle)), name, path))
+
+        scored.sort(reverse=True)
+        return [make_result(os.path.splitext(os.path.basename(path))[0], path, "app", score)
+                for score, name, path in scored[:self.MAX_RESULTS]]
+
+
+class FileSearchProvider(ResultProvider):
+    """ Walks the usual user folders for file names containing every query term. """
+    NAME = "files"
+    DEADLINE_MS = 400
+    WEIGHT = 0.6
+    MAX_RESULTS = 8
+    MAX_DEPTH = 4
+
+    def __init__(self, roots=None):
+        if roots is None:
+            home = os.path.expanduser("~")
+            roots = [os.path.join(home, d) for d in ("Desktop", "Documents", "Downloads")]
+        self.roots = roots
+
+    def search(self, context, cancelled):
+        if context.action != "file_search" or not context.entity:
+            return []
+        terms = context.entity.lower().split()
+
+        results = []
+        for root in self.roots:
+            stack = [(root, 0)]
+            while stack:
+                if cancelled.is_set() or len(results) >= self.MAX_RESULTS:
+                    return results
+                folder, depth = stack.pop()
+                try:
+                    entries = list(os.scandir(folder))
+                except OSError:
+                    continue
+                for entry in entries:
+                    name = entry.name.lower()
+                    if name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if depth < self.MAX_DEPTH:
+                            stack.append((entry.path, depth + 1))
+                    elif all(term in name for term in terms):
+                        results.append(make_result(entry.name, entry.path, "file", 0.8))
+        return results
+
+
+class RecentItems:
+    """ Launch history (name, path, count, last use) persisted as JSON. """
+    MAX_ITEMS = 50
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(USER_DIR, "recent.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.items = json.load(f)
+        except (OSError, ValueError):
+            self.items = []
+
+    def add(self, name, path):
+        with self._lock:
+            item = next((i for i in self.items if i["path"] == path), None)
+            if item is None:
+                item = {"name": name, "path": path, "count": 0}
+                self.items.append(item)
+            item["count"] += 1
+            item["last"] = time.time()
+            self.items.sort(key=lambda i: i["last"], reverse=True)
+            del self.items[self.MAX_ITEMS:]
+            try:
+                ensure_dir(os.path.dirname(self.path))
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(self.items, f)
+            except OSError:
+                pass
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.items)
+
+
+class RecentProvider(ResultProvider):
+    """ Recently launched items, ranked by frequency and recency. """
+    NAME = "recent"
+    DEADLINE_MS = 50
+    WEIGHT = 0.85
+
+    def __init__(self, recent):
+        self.recent = recent
+
+    def search(self, context, cancelled):
+        needle = (context.entity or context.query).lower().strip()
+        if len(needle) < 2:
+            return []
+
+        now = time.time()
+        results = []
+        for item in self.recent.snapshot():
+            if needle not in item["name"].lower():
+                continue
+            days = (now - item.get("last", now)) / 86400
+            frecency = min(item["count"], 10) / 10 / (1 + days)
+            results.append(make_result(item["name"], item["path"], "recent", 0.7 + 0.3 * frecency))
+        return results
+
+
+class WebSearchProvider(ResultProvider):
+    """
+    Offers a Google search when the classifier is unsure. Online suggestions
+    are off by default: queries only leave the machine when the user opts in.
+    """
+    NAME = "web"
+    DEADLINE_MS = 300
+    WEIGHT = 0.3
+    CONFIDENT_SCORE = 0.35
+    ONLINE_SUGGESTIONS = os.environ.get("NOVADESK_WEB_SUGGEST", "0") == "1"
+    SUGGEST_URL = "https://suggestqueries.google.com/complete/search?client=firefox&q="
+
+    def search(self, context, cancelled):
+        if context.intent_id != "WEB_SEARCH" and context.score > self.CONFIDENT_SCORE:
+            return []
+        query = context.query.strip()
+        if not query:
+            return []
+
+        results = [make_result(f"Search Google for '{query}'", f"web_search:{query}", "action", 1.0)]
+        if self.ONLINE_SUGGESTIONS:
+            for rank, suggestion in enumerate(self.suggest(query)):
+                if cancelled.is_set():
+                    break
+                if suggestion.lower() != query.lower():
+                    results.append(make_result(f"Search Google for '{suggestion}'", f"web_search:{suggestion}",
+                                               "action", 0.9 - 0.05 * rank))
+        return results
+
+    def suggest(self, query):
+        import urllib.parse
+        import urllib.request
+        try:
+            url = self.SUGGEST_URL + urllib.parse.quote(query)
+            with urllib.request.urlopen(url, timeout=self.DEADLINE_MS / 1000) as response:
+                return json.loads(response.read().decode("utf-8", "replace"))[1][:4]
+        except Exception:
+            return []
+
+
+def merge_results(batches, limit):
+    """ Weighted scores, de-duplicated by path (best score wins), best first. """
+    best = {}
+    for provider, results in batches:
+        for result in results:
+            ranked = dict(result, provider=provider.NAME, rank=result["score"] * provider.WEIGHT)
+            current = best.get(ranked["path"])
+            if current is None or ranked["rank"] > current["rank"]:
+                best[ranked["path"]] = ranked
+    return sorted(best.values(), key=lambda r: r["rank"], reverse=True)[:limit]
+
+
+class SearchHandle:
+    """ A running federated search; cancel() stops providers and further updates. """
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.results = []
+        self.timed_out = []     # providers that missed their deadline
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def wait(self, timeout=None):
+        self.done.wait(timeout)
+        return self.results
+
+
+class ProviderHub:
+    """
+    Runs every provider concurrently for a query. Each provider has its own
+    deadline: late providers are cancelled and their results dropped, so a
+    slow one never holds back the rest. The merged, ranked list is pushed to
+    `on_update` after every provider that finishes in time.
+    """
+    MAX_RESULTS = 12
+
+    def __init__(self, providers):
+        self.providers = providers
+        # Providers run on the shared scheduler at interactive priority;
+        # the coordinators only wait, so they get their own small pool.
+        self.coordinator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search")
+
+    def stream(self, context, on_update=None, on_done=None):
+        """ Starts a search in the background and returns its SearchHandle. """
+        handle = SearchHandle()
+        self.coordinator.submit(self._run, context, handle, on_update, on_done)
+        return handle
+
+    def search(self, context):
+        """ Blocking variant: the merged results once every provider finished or timed out. """
+        handle = SearchHandle()
+        self._run(context, handle, None, None)
+        return handle.results
+
+    def _run(self, context, handle, on_update, on_done):
+        try:
+            start = time.monotonic()
+            # Each provider polls its own event; the handle's cancel() trips them all
+            events = {provider: threading.Event() for provider in self.providers}
+            scheduler = get_scheduler()
+            futures = {
+                scheduler.submit(provider.search, context, events[provider], priority=INTERACTIVE): provider
+                for provider in self.providers
+            }
+            deadlines = {f: start + p.DEADLINE_MS / 1000 for f, p in futures.items()}
+            batches = []
+
+            pending = set(futures)
+            while pending and not handle.cancelled.is_set():
+                timeout = max(0.0, min(deadlines[f] for f in pending) - time.monotonic())
+                finished, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    try:
+                        batches.append((futures[future], future.result()))
+                    except Exception as e:
+                        print(f"Provider '{futures[future].NAME}' failed: {e}")
+                if finished:
+                    handle.results = merge_results(batches, self.MAX_RESULTS)
+                    if on_update and not handle.cancelled.is_set():
+                        on_update(handle.results)
+
+                now = time.monotonic()
+                for future in [f for f in pending if deadlines[f] <= now]:
+                    events[futures[future]].set()
+                    future.cancel()
+                    handle.timed_out.append(futures[future].NAME)
+                    pending.discard(future)
+
+            for future in pending:
+                events[futures[future]].set()
+                future.cancel()
+        finally:
+            handle.done.set()
+            if on_done and not handle.cancelled.is_set():
+                on_done(handle.results)
@@ -0,0 +1,179 @@
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+
+# Priority classes, most urgent first
+INTERACTIVE = 0     # the query the user is waiting on
+PREFETCH = 1        # work whose result is about to be shown (model reload, first app scan)
+BACKGROUND = 2      # indexing, re-embedding, crawling
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PREFETCH: "prefetch", BACKGROUND: "background"}
+
+
+class WorkScheduler:
+    """
+    Central thread pool with priority classes and a global thread budget.
+
+    - Queued work always starts in priority order.
+    - One worker is reserved for INTERACTIVE work (prefetch and background
+      jobs together use at most max_workers - 1), so an interactive job never
+      waits for a free thread; at most `max_background` run BACKGROUND jobs.
+    - While the user is typing, or interactive work is queued/running, no new
+      background job starts, and running ones block at their next checkpoint().
+      The pause outlasts each interactive job by RESULT_GRACE_S so whoever
+      waits on its result is not racing the resumed crawl for the GIL.
+    """
+    TYPING_GRACE_S = 0.4     # background stays paused this long after a keystroke
+    RESULT_GRACE_S = 0.01    # ...and this long after interactive work, so its waiter gets the GIL
+    MAX_PAUSE_S = 5.0        # a checkpoint never blocks longer than this
+    WAIT_SAMPLES = 1000
+
+    def __init__(self, max_workers=None, max_background=None):
+        if max_workers is None:
+            max_workers = int(os.environ.get("NOVADESK_THREADS", 0)) or min(8, os.cpu_count() or 2)
+        self.max_workers = max(2, max_workers)
+        self.max_background = max_background or max(1, self.max_workers // 2)
+
+        self._cond = threading.Condition()
+        self._queues = {p: deque() for p in PRIORITY_NAMES}
+        self._running = {p: 0 for p in PRIORITY_NAMES}
+        self._completed = {p: 0 for p in PRIORITY_NAMES}
+        self._waits = {p: deque(maxlen=self.WAIT_SAMPLES) for p in PRIORITY_NAMES}
+        self._foreground = 0         # interactive() sections running outside the pool
+        self._hold_until = 0.0
+        self._workers = []
+        self._local = threading.local()
+
+    # --- Submitting work ---
+    def submit(self, fn, *args, priority=BACKGROUND, **kwargs):
+        future = Future()
+        with self._cond:
+            self._queues[priority].append((future, fn, args, kwargs, time.monotonic()))
+            if len(self._workers) < self.max_workers and len(self._workers) < self._backlog():
+                worker = threading.Thread(target=self._work, name=f"scheduler-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._cond.notify_all()
+        return future
+
+    @contextmanager
+    def interactive(self):
+        """ Marks interactive work done on the caller's own thread (e.g. the UI thread). """
+        with self._cond:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._foreground -= 1
+                self._hold(self.RESULT_GRACE_S)
+                self._cond.notify_all()
+
+    def user_active(self):
+        """ Called on every keystroke: holds background work back for TYPING_GRACE_S. """
+        with self._cond:
+            self._hold(self.TYPING_GRACE_S)
+
+    def checkpoint(self):
+        """
+        Yield point for long background jobs (call it per directory, per chunk...).
+        Blocks while interactive work is pending; a no-op for other priorities.
+        """
+        if getattr(self._local, "priority", None) != BACKGROUND:
+            return
+        deadline = time.monotonic() + self.MAX_PAUSE_S
+        with self._cond:
+            while self._interactive_busy():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(min(remaining, self._hold_remaining() or remaining))
+
+    # --- Metrics ---
+    def metrics(self):
+        """ {class: {queued, running, completed, wait_p50_ms, wait_p99_ms}} """
+        with self._cond:
+            result = {}
+            for priority, name in PRIORITY_NAMES.items():
+                waits = sorted(self._waits[priority])
+                result[name] = {
+                    "queued": len(self._queues[priority]),
+                    "running": self._running[priority],
+                    "completed": self._completed[priority],
+                    "wait_p50_ms": waits[len(waits) // 2] * 1000 if waits else 0.0,
+                    "wait_p99_ms": waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000 if waits else 0.0,
+                }
+            return result
+
+    # --- Internals (call with self._cond held) ---
+    def _backlog(self):
+        return sum(len(q) for q in self._queues.values()) + sum(self._running.values())
+
+    def _hold(self, seconds):
+        self._hold_until = max(self._hold_until, time.monotonic() + seconds)
+
+    def _hold_remaining(self):
+        return max(0.0, self._hold_until - time.monotonic())
+
+    def _interactive_busy(self):
+        return bool(self._queues[INTERACTIVE] or self._running[INTERACTIVE]
+                    or self._foreground or self._hold_remaining())
+
+    def _next_job(self):
+        if self._queues[INTERACTIVE]:
+            return INTERACTIVE, self._queues[INTERACTIVE].popleft()
+        if self._running[PREFETCH] + self._running[BACKGROUND] >= self.max_workers - 1:
+            return None, None
+        if self._queues[PREFETCH]:
+            return PREFETCH, self._queues[PREFETCH].popleft()
+        if (self._queues[BACKGROUND] and self._running[BACKGROUND] < self.max_background
+                and not self._interactive_busy()):
+            return BACKGROUND, self._queues[BACKGROUND].popleft()
+        return None, None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                priority, job = self._next_job()
+                while job is None:
+                    # Wake up when a pause ends even if nobody notifies
+                    self._cond.wait(self._hold_remaining() or None)
+                    priority, job = self._next_job()
+                future, fn, args, kwargs, queued_at = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._running[priority] += 1
+                self._waits[priority].append(time.monotonic() - queued_at)
+
+            self._local.priority = priority
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+                if priority == BACKGROUND:
+                    # Nobody waits on fire-and-forget jobs: report here
+                    print(f"Background job {getattr(fn, '__name__', fn)} failed: {e}")
+            finally:
+                self._local.priority = None
+                with self._cond:
+                    self._running[priority] -= 1
+                    self._completed[priority] += 1
+                    if priority == INTERACTIVE:
+                        self._hold(self.RESULT_GRACE_S)
+                    self._cond.notify_all()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """ The process-wide scheduler, created on first use. """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = WorkScheduler()
+    return _scheduler
@@ -1,5 +1,7 @@
-import winsound
 import threading
+from src.engine.lazy import lazy_import
+
+winsound = lazy_import("winsound") # Windows-only; only touched when a sound plays
 
 class SoundEngine:
     """
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from src.engine.paths import USER_DIR, ensure_dir
+
+TRACE_DIR = os.path.join(USER_DIR, "traces")
+
+
+def anonymize_text(text, keep_words, salt):
+    """
+    Replaces every word not in `keep_words` (the KB vocabulary) with a stable
+    salted hash, so traces keep their shape and repetition but not their content.
+    """
+    words = []
+    for word in text.split():
+        if word.lower() in keep_words:
+            words.append(word)
+        else:
+            digest = hashlib.sha1((salt + word.lower()).encode("utf-8")).hexdigest()
+            words.append("w" + digest[:6])
+    return " ".join(words)
+
+
+class TraceRecorder:
+    """
+    Opt-in (NOVADESK_TRACE=1) recorder of query sessions for replay testing.
+
+    One JSON line per submitted query, appended to traces/trace-YYYYMMDD.jsonl:
+        {"t": start_epoch, "k": [[ms_since_prev, text], ...], "q": query, "c": chosen}
+    """
+    def __init__(self, path=None, anonymize=True, keep_words=None):
+        if path is None:
+            path = os.path.join(ensure_dir(TRACE_DIR), time.strftime("trace-%Y%m%d.jsonl"))
+        self.path = path
+        self.anonymize = anonymize
+        self.keep_words = keep_words or set()
+        # Per-file salt: hashes are stable within a trace but not linkable across users
+        self.salt = hashlib.sha1(f"{os.getpid()}{time.time()}".encode()).hexdigest()[:8]
+        self._lock = threading.Lock()
+        self._session = None
+        self._last_key = None
+        self._pending = None
+
+    @classmethod
+    def from_env(cls):
+        """ Returns a recorder when NOVADESK_TRACE is set, else None. """
+        if os.environ.get("NOVADESK_TRACE", "0") in ("", "0"):
+            return None
+        return cls(anonymize=os.environ.get("NOVADESK_TRACE_ANONYMIZE", "1") != "0")
+
+    def _clean(self, text):
+        return anonymize_text(text, self.keep_words, self.salt) if self.anonymize else text
+
+    def keystroke(self, text):
+        now = time.time()
+        with self._lock:
+            if self._session is None:
+                self._session = {"t": round(now, 3), "k": []}
+                self._last_key = now
+            self._session["k"].append([int((now - self._last_key) * 1000), self._clean(text)])
+            self._last_key = now
+
+    def submit(self, query):
+        """ Closes the current session; it is written once a candidate is chosen or the next query starts. """
+        with self._lock:
+            self._flush()
+            session = self._session or {"t": round(time.time(), 3), "k": []}
+            session["q"] = self._clean(query)
+            session["c"] = None
+            self._pending = session
+            self._session = None
+
+    def choose(self, candidate_path):
+        with self._lock:
+            if self._pending is not None:
+                # Only the file name: full paths leak user folders
+                name = os.path.splitext(os.path.basename(candidate_path))[0]
+                self._pending["c"] = self._clean(name)
+                self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self._pending, separators=(",", ":")) + "\n")
+        self._pending = None
+
+
+def load_trace(path):
+    sessions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                sessions.append(json.loads(line))
+    return sessions
@@ -0,0 +1,319 @@
+import os
+import json
+from src.engine.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Bump when the on-disk layout changes
+INDEX_FORMAT_VERSION = 2
+
+# Below this many vectors brute force is exact and about as fast as an IVF
+# index tuned for >= 0.97 recall. scripts/benchmark_vector_index.py
+# (recall@10, p50 per query, 384-d):
+#     20k   flat 1.1ms         ivf@8 0.83, ivf@64 0.99 at 1.1ms
+#     50k   flat 3.7ms         ivf@64 0.96 at 1.8ms, ivf@128 0.997 at 3.8ms
+#     100k  flat 15-21ms       ivf@auto (126 of 632 buckets) 0.98 at 9.9ms
+# The classifier takes the top-1 hit, so it must not silently lose recall.
+IVF_MIN_SIZE = 100000
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over L2-normalized float32 vectors, keyed by int ids.
+
+    Storage shared by all backends: a growable (capacity, dim) matrix, the id
+    of each row and an `alive` mask. Removal tombstones a row; once enough
+    rows are dead the matrix is compacted.
+    """
+    BACKEND = None
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.size = 0           # rows in use (alive or dead)
+        self.row_of = {}        # id -> row
+        self.n_dead = 0
+
+    def __len__(self):
+        return self.size - self.n_dead
+
+    def __contains__(self, vector_id):
+        return vector_id in self.row_of
+
+    # --- Mutation ---
+    def add(self, ids, vectors):
+        """
+        Adds (or replaces) vectors; `vectors` is (n, dim), `ids` has n ints.
+        An id repeated within one call keeps its last vector.
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        if len(np.unique(ids)) < len(ids):
+            # Last occurrence wins: unique() on the reversed ids finds those rows
+            _, last = np.unique(ids[::-1], return_index=True)
+            keep = np.sort(len(ids) - 1 - last)
+            ids, vectors = ids[keep], vectors[keep]
+        self.remove([i for i in ids.tolist() if i in self.row_of])
+
+        self._reserve(self.size + len(ids))
+        rows = np.arange(self.size, self.size + len(ids))
+        self.vectors[rows] = vectors
+        self.ids[rows] = ids
+        self.alive[rows] = True
+        self.size += len(ids)
+        for vector_id, row in zip(ids.tolist(), rows.tolist()):
+            self.row_of[vector_id] = row
+        self._on_add(rows)
+
+    def remove(self, ids):
+        for vector_id in ids:
+            row = self.row_of.pop(int(vector_id), None)
+            if row is not None:
+                self.alive[row] = False
+                self.n_dead += 1
+        if self.n_dead and self.n_dead > self.COMPACT_RATIO * self.size:
+            self.compact()
+
+    def compact(self):
+        """ Drops tombstoned rows. """
+        keep = np.flatnonzero(self.alive[:self.size])
+        self.vectors = np.ascontiguousarray(self.vectors[keep])
+        self.ids = self.ids[keep]
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.size = len(keep)
+        self.n_dead = 0
+        self.row_of = {vector_id: row for row, vector_id in enumerate(self.ids.tolist())}
+        self._on_compact(keep)
+
+    def _reserve(self, capacity):
+        if capacity <= len(self.vectors) and self.vectors.flags.writeable:
+            return
+        new_capacity = max(capacity, 2 * len(self.vectors), 64)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        ids = np.zeros(new_capacity, dtype=np.int64)
+        ids[:self.size] = self.ids[:self.size]
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self.size] = self.alive[:self.size]
+        self.vectors, self.ids, self.alive = vectors, ids, alive
+
+    # --- Search ---
+    def search(self, query, k=1):
+        """ Returns (ids, scores) of the k best matches, best first. """
+        query = np.asarray(query, dtype=np.float32)
+        rows = self._candidate_rows(query)
+        if rows is None:
+            scores = self.vectors[:self.size] @ query
+            scores = np.where(self.alive[:self.size], scores, -np.inf)
+            rows = np.arange(self.size)
+        else:
+            rows = rows[self.alive[rows]]
+            scores = self.vectors[rows] @ query
+
+        k = min(k, len(self))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        return self.ids[rows[top]], scores[top]
+
+    # --- Backend hooks ---
+    def _candidate_rows(self, query):
+        """ Rows worth scoring for `query`, or None for all of them. """
+        return None
+
+    def _on_add(self, rows):
+        pass
+
+    def _on_compact(self, keep):
+        pass
+
+    # --- Persistence ---
+    def _meta(self):
+        return {"format_version": INDEX_FORMAT_VERSION, "backend": self.BACKEND, "dim": self.dim}
+
+    def _arrays(self):
+        keep = np.flatnonzero(self.alive[:self.size])
+        return {"vectors": self.vectors[keep], "ids": self.ids[keep]}, keep
+
+    def save(self, path):
+        """
+        Saves to a directory of .npy files that load() can memory-map.
+        meta.json lists the arrays; leftovers from an earlier save (e.g. the
+        centroids of a trained index, when saving an untrained one) are deleted.
+        """
+        os.makedirs(path, exist_ok=True)
+        arrays, _ = self._arrays()
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+        for file in os.listdir(path):
+            if file.endswith(".npy") and file[:-4] not in arrays:
+                os.remove(os.path.join(path, file))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(dict(self._meta(), arrays=sorted(arrays)), f)
+
+    def _restore(self, arrays, meta):
+        self.vectors = arrays["vectors"]
+        self.ids = np.array(arrays["ids"], dtype=np.int64)
+        self.size = len(self.ids)
+        self.alive = np.ones(self.size, dtype=bool)
+        self.row_of = {vector_id: row for row, vector_id in enumerate(self.ids.tolist())}
+
+
+class FlatIndex(VectorIndex):
+    """ Exact brute-force search: one matrix-vector product per query. """
+    BACKEND = "flat"
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid
+    and a query only scores the `nprobe` closest buckets (default:
+    NPROBE_FRACTION of them, see IVF_MIN_SIZE for the numbers).
+    Until `train_size` vectors exist it behaves like FlatIndex; it retrains
+    itself when the corpus grows past `retrain_factor` x the last training size.
+    """
+    BACKEND = "ivf"
+    MAX_TRAIN_SAMPLE = 25000
+    NPROBE_FRACTION = 0.2
+    MIN_NPROBE = 8
+
+    def __init__(self, dim, nlist=None, nprobe=None, train_size=4096, retrain_factor=4.0):
+        super().__init__(dim)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.retrain_factor = retrain_factor
+        self.trained_at = 0
+        self.centroids = None
+        self.assign = np.zeros(0, dtype=np.int32)
+        self._lists = None      # (order, offsets): rows sorted by bucket
+
+    def train(self, iterations=10, seed=0):
+        """ Spherical k-means on (a sample of) the alive vectors. """
+        rows = np.flatnonzero(self.alive[:self.size])
+        if not len(rows):
+            return
+        nlist = min(self.nlist or max(1, int(2 * np.sqrt(len(rows)))), len(rows))
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(rows), 64 * nlist, self.MAX_TRAIN_SAMPLE)
+        sample = self.vectors[np.sort(rng.choice(rows, size=sample_size, replace=False))]
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            # Per-bucket sums via sort + reduceat (np.add.at is far slower)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=nlist)
+            filled = np.flatnonzero(counts)
+            starts = (np.cumsum(counts) - counts)[filled]
+            sums = np.zeros_like(centroids)
+            sums[filled] = np.add.reduceat(sample[order], starts, axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty buckets keep their old centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-9), centroids)
+
+        self.centroids = centroids.astype(np.float32)
+        self.trained_at = len(rows)
+        self.assign = np.full(len(self.vectors), -1, dtype=np.int32)
+        self._assign_rows(np.arange(self.size))
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def _assign_rows(self, rows):
+        if len(self.assign) < len(self.vectors):
+            assign = np.full(len(self.vectors), -1, dtype=np.int32)
+            assign[:len(self.assign)] = self.assign
+            self.assign = assign
+        for start in range(0, len(rows), 8192):
+            chunk = rows[start:start + 8192]
+            self.assign[chunk] = np.argmax(self.vectors[chunk] @ self.centroids.T, axis=1)
+        self._lists = None
+
+    def _on_add(self, rows):
+        if not self.is_trained:
+            if len(self) >= self.train_size:
+                self.train()
+        elif len(self) >= self.retrain_factor * self.trained_at:
+            self.train()
+        else:
+            self._assign_rows(rows)
+
+    def _on_compact(self, keep):
+        if self.is_trained:
+            self.assign = self.assign[keep]
+            self._lists = None
+
+    def _candidate_rows(self, query):
+        if not self.is_trained:
+            return None
+        if self._lists is None:
+            order = np.argsort(self.assign[:self.size], kind="stable")
+            offsets = np.searchsorted(self.assign[:self.size][order], np.arange(len(self.centroids) + 1))
+            self._lists = (order, offsets)
+        order, offsets = self._lists
+
+        nprobe = self.nprobe or max(self.MIN_NPROBE, round(self.NPROBE_FRACTION * len(self.centroids)))
+        nprobe = min(nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([order[offsets[b]:offsets[b + 1]] for b in probe])
+
+    def _meta(self):
+        meta = super()._meta()
+        meta.update(nlist=self.nlist, nprobe=self.nprobe, train_size=self.train_size,
+                    retrain_factor=self.retrain_factor, trained_at=self.trained_at)
+        return meta
+
+    def _arrays(self):
+        arrays, keep = super()._arrays()
+        if self.is_trained:
+            arrays["centroids"] = self.centroids
+            arrays["assign"] = self.assign[keep]
+        return arrays, keep
+
+    def _restore(self, arrays, meta):
+        super()._restore(arrays, meta)
+        self.trained_at = meta["trained_at"]
+        if "centroids" in arrays:
+            self.centroids = np.array(arrays["centroids"], dtype=np.float32)
+            self.assign = np.array(arrays["assign"], dtype=np.int32)
+
+
+BACKENDS = {cls.BACKEND: cls for cls in (FlatIndex, IVFIndex)}
+
+
+def make_index(dim, expected_size=0, backend=None, **options):
+    """ Picks a backend by corpus size unless one is requested explicitly. """
+    if backend is None:
+        backend = "ivf" if expected_size >= IVF_MIN_SIZE else "flat"
+    return BACKENDS[backend](dim, **options)
+
+
+def load_index(path, mmap=True):
+    """
+    Loads an index saved with VectorIndex.save(). With mmap=True the vector
+    matrix stays on disk (read-only memmap) until the index is modified.
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != INDEX_FORMAT_VERSION:
+        raise ValueError(f"Unsupported vector index format in {path}")
+
+    # Only what this save wrote: never a stray .npy from an older save
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+              for name in meta["arrays"]}
+
+    cls = BACKENDS[meta["backend"]]
+    if cls is IVFIndex:
+        index = IVFIndex(meta["dim"], nlist=meta["nlist"], nprobe=meta["nprobe"],
+                         train_size=meta["train_size"], retrain_factor=meta["retrain_factor"])
+    else:
+        index = cls(meta["dim"])
+    index._restore(arrays, meta)
+    return index
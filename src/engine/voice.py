@@ -1,4 +1,6 @@
-import speech_recognition as sr
+from src.engine.lazy import lazy_import
+
+sr = lazy_import("speech_recognition")
 
 class VoiceEngine:
     def __init__(self):
@@ -3,9 +3,14 @@ import os
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                                QPushButton, QLabel, QLineEdit, QListWidget, 
                                QApplication, QListWidgetItem)
-from PySide6.QtCore import Qt, QSize, QThread, Signal
+from PySide6.QtCore import Qt, QSize, QThread, QTimer, QEvent, Signal
 from PySide6.QtGui import QColor, QPalette, QFont, QIcon, QPixmap
-from src.engine.voice import VoiceEngine
+from src.engine.trace import TraceRecorder
+from src.engine.sound import SoundEngine
+from src.engine.scheduler import get_scheduler
+from src.engine import calculator
+
+RESULT_ICONS = {"app": "🚀", "answer": "🧮", "file": "📄", "recent": "🕘", "action": "🔎"}
 
 # Thread to load the AI Model without freezing the UI
 class LoaderThread(QThread):
@@ -16,6 +21,8 @@ class LoaderThread(QThread):
         from src.engine.commander import Commander
         
         nlp = IntentClassifier()
+        nlp.start_watching() # Hot-reload intent packs
+        nlp.start_idle_unloading() # Low-memory mode (if enabled)
         cmd = Commander()
         self.loaded.emit(nlp, cmd)
 
@@ -23,11 +30,15 @@ class VoiceWorker(QThread):
     finished = Signal(str)
     
     def run(self):
+        from src.engine.voice import VoiceEngine
+
         engine = VoiceEngine()
         text = engine.listen_one_shot()
         self.finished.emit(text if text else "")
 
 class MainWindow(QMainWindow):
+    results_ready = Signal(int, object, bool) # (search generation, results, done) from provider threads
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("NovaDesk v0.1")
@@ -40,6 +51,12 @@ class MainWindow(QMainWindow):
         self.nlp = None
         self.commander = None
         self.is_loading = True
+        self.loading_scheduled = False
+        self.tracer = TraceRecorder.from_env() # Opt-in query trace recording
+        self.search_handle = None
+        self.search_generation = 0
+        self.last_prediction = None
+        self.results_ready.connect(self.on_results)
 
         # 1. Window Flags
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
@@ -67,6 +84,7 @@ class MainWindow(QMainWindow):
         self.search_input.setPlaceholderText("Initializing Brain... please wait")
         self.search_input.setEnabled(False)
         self.search_input.returnPressed.connect(self.process_command)
+        self.search_input.textEdited.connect(self.on_user_activity)
         
         self.btn_mic = QPushButton("🎙️")
         self.btn_mic.setFixedSize(45, 45) # Slightly bigger for easy tap
@@ -139,7 +157,14 @@ class MainWindow(QMainWindow):
         self.center_on_screen()
         self.load_stylesheet()
         
-        # Start Loading AI
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        # Start Loading AI only after the first paint, so the window shows up instantly
+        if not self.loading_scheduled:
+            self.loading_scheduled = True
+            QTimer.singleShot(0, self.start_loading)
+
+    def start_loading(self):
         self.loader_thread = LoaderThread()
         self.loader_thread.loaded.connect(self.on_ai_loaded)
         self.loader_thread.start()
@@ -235,11 +260,32 @@ class MainWindow(QMainWindow):
         self.nlp = nlp
         self.commander = commander
         self.is_loading = False
+        if self.tracer:
+            self.tracer.keep_words = nlp.vocab
         self.search_input.setPlaceholderText("Ask NovaDesk... (e.g. 'Open Spotify')")
         self.search_input.setEnabled(True)
         self.btn_mic.setEnabled(True)
         self.search_input.setFocus()
 
+    def on_user_activity(self, text=None):
+        if self.tracer and text is not None:
+            self.tracer.keystroke(text)
+
+        # Typing pauses background indexing so queries get the CPU
+        get_scheduler().user_active()
+
+        # Low-memory mode: start reloading unloaded models while the user types
+        if self.nlp:
+            self.nlp.warm_up()
+        if self.commander:
+            self.commander.indexer.maybe_rescan()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # Window summoned (hotkey/click) -> get the models ready before the first keystroke
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.on_user_activity()
+
     def load_stylesheet(self):
         try:
             with open("src/ui/styles.qss", "r") as f:
@@ -256,77 +302,123 @@ class MainWindow(QMainWindow):
     def process_command(self):
         query = self.search_input.text()
         if not query: return
+        if self.tracer:
+            self.tracer.submit(query)
         
         self.results_list.clear() 
         self.results_list.show()
         self.resize(950, 500)
         
         # 1. Predict Intent
-        intent, score, entity = self.nlp.predict(query)
+        with get_scheduler().interactive():
+            intent, score, entity = self.nlp.predict(query)
         print(f"Predicted: {intent} ({score}) -> {entity}")
 
-        # 2. Get Candidates
-        candidates = self.commander.fetch_candidates(intent, entity)
-        
+        # 2. System intents (volume, lock, settings...) run right away,
+        #    unless the query is math: "2+2" must never press a key or lock the PC
+        if (score > 0.35 and self.commander.is_direct_action(intent)
+                and calculator.answer(query) is None):
+            result_msg = self.commander.execute(intent, entity)
+            self.results_list.addItem(f"✅ {result_msg}")
+            SoundEngine.play('success')
+            self.search_input.clear()
+            return
+
+        # 3. Stream candidates from every provider; a newer query cancels this one
+        if self.search_handle:
+            self.search_handle.cancel()
+        self.search_generation += 1
+        self.last_prediction = (query, intent, score, entity)
+        generation = self.search_generation
+        self.search_handle = self.commander.stream_candidates(
+            query, intent, score, entity,
+            on_update=lambda results: self.results_ready.emit(generation, results, False),
+            on_done=lambda results: self.results_ready.emit(generation, results, True)
+        )
+        self.results_list.addItem(f"🔍 Searching for '{query}'...")
+        self.search_input.clear()
+
+    def on_results(self, generation, candidates, done):
+        # Runs on the UI thread (queued signal); drop results of superseded queries
+        if generation != self.search_generation:
+            return
+        query, intent, score, entity = self.last_prediction
+        self.results_list.clear()
+
         if candidates:
             # Add Header
-            header = QListWidgetItem(f"✨ Found {len(candidates)} suggestions for '{query}':")
+            suffix = "" if done else " (still searching...)"
+            header = QListWidgetItem(f"✨ Found {len(candidates)} suggestions for '{query}'{suffix}:")
             header.setFlags(Qt.NoItemFlags) # Make header non-selectable
             self.results_list.addItem(header)
             
             for app in candidates:
-                # Create Item
-                item = QListWidgetItem(self.results_list)
-                
-                # Create Custom Widget for the Item
-                widget = QWidget()
-                layout = QHBoxLayout(widget)
-                layout.setContentsMargins(20, 10, 20, 10)
-                
-                # App Name Label
-                name_label = QLabel(f"🚀 {app['name']}")
-                name_label.setStyleSheet("color: #cdd6f4; font-size: 15px; font-weight: 500;")
-                
-                # OPEN Button (Compact Icon Style)
-                open_btn = QPushButton("➜")
-                open_btn.setCursor(Qt.PointingHandCursor)
-                open_btn.setFixedSize(40, 30)
-                open_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #89b4fa; 
-                        color: #1e1e2e; 
-                        border-radius: 15px; /* Circular aesthetics */
-                        font-weight: bold;
-                        font-size: 16px;
-                    }
-                    QPushButton:hover {
-                        background-color: #b4befe;
-                    }
-                """)
-                
-                # Connect Button using a lambda to capture specific app path/command
-                # We usage app['path'] for execution (contains full path or special command)
-                open_btn.clicked.connect(lambda checked=False, p=app['path']: self.execute_suggestion(p))
-                
-                layout.addWidget(name_label)
-                layout.addStretch()
-                layout.addWidget(open_btn)
-                
-                item.setSizeHint(widget.sizeHint())
-                self.results_list.setItemWidget(item, widget)
-            
-        else:
-            # 3. Direct Execution fallback
+                self.add_result_item(app)
+
+        elif done:
+            # 4. Direct Execution fallback
             if score > 0.35:
                 result_msg = self.commander.execute(intent, entity)
                 self.results_list.addItem(f"✅ {result_msg}")
                 SoundEngine.play('success')
             else:
                 self.results_list.addItem("❓ I'm not sure what you mean.")
-            
-        self.search_input.clear()
+        else:
+            self.results_list.addItem(f"🔍 Searching for '{query}'...")
+
+    def add_result_item(self, app):
+        # Create Item
+        item = QListWidgetItem(self.results_list)
+        
+        # Create Custom Widget for the Item
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        layout.setContentsMargins(20, 10, 20, 10)
+        
+        # Result Label
+        icon = RESULT_ICONS.get(app.get("type"), "🚀")
+        name_label = QLabel(f"{icon} {app['name']}")
+        name_label.setStyleSheet("color: #cdd6f4; font-size: 15px; font-weight: 500;")
+        
+        # OPEN Button (Compact Icon Style)
+        open_btn = QPushButton("➜")
+        open_btn.setCursor(Qt.PointingHandCursor)
+        open_btn.setFixedSize(40, 30)
+        open_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #89b4fa; 
+                color: #1e1e2e; 
+                border-radius: 15px; /* Circular aesthetics */
+                font-weight: bold;
+                font-size: 16px;
+            }
+            QPushButton:hover {
+                background-color: #b4befe;
+            }
+        """)
+        
+        # Connect Button using a lambda to capture specific app path/command
+        # We usage app['path'] for execution (contains full path or special command)
+        open_btn.clicked.connect(lambda checked=False, p=app['path']: self.execute_suggestion(p))
+        
+        layout.addWidget(name_label)
+        layout.addStretch()
+        layout.addWidget(open_btn)
+        
+        item.setSizeHint(widget.sizeHint())
+        self.results_list.setItemWidget(item, widget)
 
     def execute_suggestion(self, app_name):
+        if self.tracer:
+            self.tracer.choose(app_name)
+
+        # Inline answers (calculator / unit conversion) are copied, not launched
+        if app_name.startswith("copy:"):
+            QApplication.clipboard().setText(app_name[len("copy:"):])
+            self.results_list.addItem(f"📋 Copied {app_name[len('copy:'):]} to clipboard")
+            self.results_list.scrollToBottom()
+            return
+
         self.results_list.addItem(f"Executing: {app_name}...")
         # Scroll to bottom to show action
         self.results_list.scrollToBottom()
@@ -337,6 +429,11 @@ class MainWindow(QMainWindow):
         self.results_list.scrollToBottom()
         SoundEngine.play('success')
 
+    def closeEvent(self, event):
+        if self.tracer:
+            self.tracer.close()
+        super().closeEvent(event)
+
     def mousePressEvent(self, event):
         self.oldPos = event.globalPos()
 